@@ -0,0 +1,290 @@
+"""
+Benchmarks for the lab data pipelines.
+
+Generates synthetic grades (StudentID, Name, Subject, Grade, Date) and
+students (marks, study_hours, attendance, grade) tables at increasing sizes,
+runs each pipeline stage from the Unit-7, Unit-8 and Unit-9 labs on them,
+and records the wall time and peak memory of every stage.
+
+Two memory figures are kept. peak_bytes comes from tracemalloc, which does
+not see every buffer: pandas 3 keeps strings (Name, Subject, Date) in Arrow
+memory that tracemalloc cannot trace. peak_rss_bytes is how far the
+resident set grew above its level at the start of the stage. It covers
+those buffers too, but only Linux can reset the peak between stages
+(through /proc/self/clear_refs). Elsewhere it is the growth of the
+process-wide peak and may be 0 for a stage that stays below an earlier one.
+
+The lab scripts read fixed files and print their results, so each stage
+restates the script's steps on the generated tables. Code the labs share
+(the Scaler from Python_Labs/scalers.py, and the RSS helpers from
+Python_Labs/instrument.py) is imported rather than copied.
+When a lab script changes, update its stage here too.
+
+Usage:
+    python benchmarks/bench_pipelines.py --sizes 1e3 1e4 1e5 1e6 --out results.json
+    python benchmarks/bench_pipelines.py --sizes 1e5 --compare results.json
+
+Results are saved as JSON so two runs can be compared with --compare; any
+stage that got slower by more than --threshold is reported as a regression.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+LABS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "content", "unreleased", "Unit-7", "Labs", "Python_Labs")
+sys.path.insert(0, LABS)
+
+from instrument import _memory, _reset_peak_rss  # noqa: E402  (lab modules, found through LABS)
+from scalers import Scaler  # noqa: E402
+
+SUBJECTS = ["Math", "English", "Science", "Nepali"]
+NAMES = ["Asha", "Raj", "Lina", "Tara", "Ram", "Sita", "John", "Ashok", "Manu", "Bina"]
+
+
+def make_grades(n, seed=0):
+    """
+    Synthetic grades table shaped like grades.csv.
+
+    About 5% of grades are missing, 1% are outliers and 2% of the rows are
+    exact duplicates of earlier rows.
+    """
+    rng = np.random.default_rng(seed)
+    grade = rng.normal(70, 12, n).clip(0, 100).round()
+    outlier = rng.random(n) < 0.01
+    grade[outlier] = rng.choice([0.0, 5.0, 150.0], outlier.sum())
+    grade[rng.random(n) < 0.05] = np.nan
+    df = pd.DataFrame({
+        "StudentID": rng.integers(1000, 1000 + max(n // 4, 1), n),
+        "Name": rng.choice(NAMES, n),
+        "Subject": rng.choice(SUBJECTS, n),
+        "Grade": grade,
+        "Date": (np.datetime64("2025-05-01") + rng.integers(0, 60, n)).astype(str),
+    })
+    # Copy each chosen row from the row before it.
+    src = np.arange(n)
+    dup = np.flatnonzero(rng.random(n) < 0.02)
+    src[dup[dup > 0]] -= 1
+    return df.iloc[src].reset_index(drop=True)
+
+
+def make_students(n, seed=0):
+    """Synthetic students table used by the Unit-8 and Unit-9 labs."""
+    rng = np.random.default_rng(seed)
+    hours = rng.uniform(0, 10, n)
+    marks = (40 + 5 * hours + rng.normal(0, 8, n)).clip(0, 100).round()
+    return pd.DataFrame({
+        "marks": marks,
+        "study_hours": hours.round(1),
+        "attendance": (60 + 3 * hours + rng.normal(0, 5, n)).clip(0, 100).round(),
+        "grade": pd.cut(marks, [-1, 40, 60, 80, 101], labels=["D", "C", "B", "A"]).astype(str),
+    })
+
+
+# Pipeline stages. Each takes the generated tables and mirrors one lab script.
+
+def stage_missing_values(grades, students):
+    # q6_missing_values.py
+    df = grades
+    df.isnull().sum()
+    df.dropna()
+    df.copy().fillna({"Grade": df["Grade"].mean()})
+    df.copy().ffill()
+    df.copy().fillna({"Grade": df["Grade"].median(), "Name": "Unknown"})
+
+
+def stage_outliers(grades, students):
+    # q8_outliers.py
+    df = grades
+    q1, q3 = df["Grade"].quantile([0.25, 0.75])
+    iqr = q3 - q1
+    df[(df["Grade"] < q1 - 1.5 * iqr) | (df["Grade"] > q3 + 1.5 * iqr)]
+
+
+def stage_normalization(grades, students):
+    # q10_normalization.py
+    df = grades.copy()
+    df["Norm"] = Scaler("minmax", ["Grade"]).fit(df).scale(df["Grade"])
+    df[df["Norm"] > 0.8]
+
+
+def stage_full_cleaning(grades, students):
+    # q12_full_cleaning.py (without the file write)
+    df = grades.copy()
+    df["Grade"] = df["Grade"].fillna(df["Grade"].mean())
+    df = df.drop_duplicates()
+    q1 = df["Grade"].quantile(0.25)
+    q3 = df["Grade"].quantile(0.75)
+    iqr = q3 - q1
+    df = df[(df["Grade"] >= q1 - 1.5 * iqr) & (df["Grade"] <= q3 + 1.5 * iqr)]
+    df["Grade_norm"] = (df["Grade"] - df["Grade"].min()) / (df["Grade"].max() - df["Grade"].min())
+    df["Grade"] = df["Grade"].astype(float)
+    df["Date"] = pd.to_datetime(df["Date"])
+
+
+def stage_eda_stats(grades, students):
+    # lab1_pandas_stats.py / lab2_numpy_stats.py / lab10_full_eda.py
+    marks = students["marks"]
+    marks.mean(), marks.median(), marks.mode()[0], marks.min(), marks.max(), marks.std()
+
+
+def stage_correlation(grades, students):
+    # lab8_correlation.py / lab9_covariance.py
+    cols = students[["marks", "study_hours", "attendance"]]
+    cols.corr()
+    cols.cov()
+
+
+def stage_regression(grades, students):
+    # Unit-9 lab1_regression.py
+    from sklearn.linear_model import LinearRegression
+    LinearRegression().fit(students[["study_hours"]], students["marks"])
+
+
+def stage_clustering(grades, students):
+    # Unit-9 lab3_clustering.py
+    from sklearn.cluster import KMeans
+    KMeans(n_clusters=2, n_init=1, random_state=0).fit(students[["study_hours", "marks"]].to_numpy())
+
+
+STAGES = {
+    "missing_values": stage_missing_values,
+    "outliers": stage_outliers,
+    "normalization": stage_normalization,
+    "full_cleaning": stage_full_cleaning,
+    "eda_stats": stage_eda_stats,
+    "correlation": stage_correlation,
+    "regression": stage_regression,
+    "clustering": stage_clustering,
+}
+
+
+def measure(func, *args, repeat=3):
+    """
+    Run `func(*args)` and report the best wall time and the peak memory
+    used while it ran.
+
+    A warm-up run (which also does lazy imports) comes first, then one run
+    traced with tracemalloc, one run watching the resident set, then
+    `repeat` timed runs without tracing.
+
+    Returns:
+        tuple: (seconds, peak traced bytes, peak RSS growth in bytes or None)
+    """
+    func(*args)
+    tracemalloc.start()
+    try:
+        func(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    _reset_peak_rss()
+    current, before = _memory()
+    func(*args)
+    _, after = _memory()
+    peak_rss = None if after is None else max(0, after - (current if current is not None else before))
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times), peak, peak_rss
+
+
+def run(sizes, stages, repeat=3, seed=0):
+    """
+    Benchmark each stage at each size.
+
+    Returns:
+        list of dict: One entry per (stage, rows) with seconds, peak_bytes,
+        peak_rss_bytes, rows_per_sec, or an error message if the stage failed.
+    """
+    results = []
+    for n in sizes:
+        try:
+            grades, students = make_grades(n, seed), make_students(n, seed)
+        except MemoryError:
+            print(f"{n:>12,} rows: not enough memory to generate data, stopping")
+            break
+        for name in stages:
+            entry = {"stage": name, "rows": n}
+            try:
+                seconds, peak, peak_rss = measure(STAGES[name], grades, students, repeat=repeat)
+                entry.update(seconds=seconds, peak_bytes=peak, peak_rss_bytes=peak_rss,
+                             rows_per_sec=n / seconds if seconds else None)
+                rss = "" if peak_rss is None else f"  {peak_rss / 2 ** 20:10.1f} MiB RSS"
+                print(f"{n:>12,} rows  {name:<16} {seconds * 1000:10.2f} ms  {peak / 2 ** 20:10.1f} MiB{rss}")
+            except (ImportError, MemoryError) as exc:
+                entry["error"] = f"{type(exc).__name__}: {exc}"
+                print(f"{n:>12,} rows  {name:<16} skipped ({entry['error']})")
+            results.append(entry)
+        del grades, students
+    return results
+
+
+def compare(old, new, threshold=0.10):
+    """
+    Print the time ratio new/old for every (stage, rows) in both runs.
+
+    Returns:
+        list of tuple: (stage, rows, ratio) for stages slower than 1 + threshold.
+    """
+    before = {(r["stage"], r["rows"]): r for r in old["results"] if "seconds" in r}
+    regressions = []
+    for r in new["results"]:
+        key = (r["stage"], r["rows"])
+        if "seconds" not in r or key not in before:
+            continue
+        ratio = r["seconds"] / before[key]["seconds"]
+        flag = "  REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{r['rows']:>12,} rows  {r['stage']:<16} x{ratio:6.2f}{flag}")
+        if flag:
+            regressions.append((r["stage"], r["rows"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1e3, 1e4, 1e5, 1e6],
+                        help="row counts to test (up to 1e8)")
+    parser.add_argument("--stages", nargs="+", choices=sorted(STAGES), default=list(STAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against an earlier results file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown ratio reported as a regression (default 0.10)")
+    args = parser.parse_args(argv)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "machine": platform.platform(),
+        },
+        "results": run([int(n) for n in args.sizes], args.stages, args.repeat, args.seed),
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        if compare(old, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
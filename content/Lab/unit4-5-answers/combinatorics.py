@@ -0,0 +1,207 @@
+"""
+Module: combinatorics
+
+Factorials, permutations and combinations without recursion.
+
+Factorials up to TABLE_LIMIT are kept in a table that grows on demand, so
+repeated calls are lookups. Larger factorials start from the last table
+entry and multiply the remaining numbers by binary splitting (multiplying
+numbers of similar size), which is much faster than multiplying one number
+at a time. log_factorial and log_comb work on NumPy arrays and are meant
+for probabilities where the exact numbers would be huge.
+
+Unlike q3_factorial.factorial, nothing here is recursive on n, so there is
+no recursion limit.
+"""
+
+from math import lgamma
+
+import numpy as np
+
+try:
+    from scipy.special import gammaln
+except ImportError:  # pragma: no cover - scipy is optional
+    gammaln = np.frompyfunc(lgamma, 1, 1)
+
+# Factorials up to this n are cached (about 1 MB of integers at the limit).
+TABLE_LIMIT = 1000
+
+_table = [1]  # _table[n] == n!
+
+
+def _check(n):
+    if not isinstance(n, (int, np.integer)) or isinstance(n, bool):
+        raise TypeError(f"expected an integer, got {type(n).__name__}")
+    if n < 0:
+        raise ValueError("factorial is not defined for negative numbers")
+    return int(n)
+
+
+def _product(low, high):
+    """
+    Product of the integers low..high (1 if the range is empty).
+
+    The range is multiplied in pairs of similar-sized halves (binary
+    splitting), using a loop and a work list instead of recursion.
+    """
+    if low > high:
+        return 1
+    # Start from small blocks multiplied directly, then merge neighbours.
+    parts = []
+    for start in range(low, high + 1, 8):
+        p = 1
+        for i in range(start, min(start + 8, high + 1)):
+            p *= i
+        parts.append(p)
+    while len(parts) > 1:
+        merged = [parts[i] * parts[i + 1] for i in range(0, len(parts) - 1, 2)]
+        if len(parts) % 2:
+            merged.append(parts[-1])
+        parts = merged
+    return parts[0]
+
+
+def _grow(n):
+    """Extend the table up to min(n, TABLE_LIMIT)."""
+    last = len(_table) - 1
+    for i in range(last + 1, min(n, TABLE_LIMIT) + 1):
+        _table.append(_table[-1] * i)
+
+
+def factorial(n):
+    """
+    Compute n! exactly.
+
+    Args:
+        n (int): A non-negative integer.
+
+    Returns:
+        int: n factorial.
+
+    Examples:
+        >>> factorial(5)
+        120
+        >>> factorial(5000).bit_length()
+        54233
+    """
+    n = _check(n)
+    _grow(n)
+    if n <= TABLE_LIMIT:
+        return _table[n]
+    return _table[TABLE_LIMIT] * _product(TABLE_LIMIT + 1, n)
+
+
+def factorial_many(ns):
+    """
+    Compute the factorials of many numbers at once.
+
+    The numbers are handled in increasing order, and each factorial is
+    built from the previous one, so the total work is that of the largest.
+
+    Args:
+        ns (iterable of int): Non-negative integers.
+
+    Returns:
+        list of int: The factorials, in the order of `ns`.
+
+    Examples:
+        >>> factorial_many([5, 0, 3])
+        [120, 1, 6]
+    """
+    ns = [_check(n) for n in ns]
+    results = {}
+    prev_n, prev = 0, 1
+    for n in sorted(set(ns)):
+        if n <= TABLE_LIMIT:
+            _grow(n)
+            prev_n, prev = n, _table[n]
+        else:
+            if prev_n < TABLE_LIMIT:
+                _grow(TABLE_LIMIT)
+                prev_n, prev = TABLE_LIMIT, _table[TABLE_LIMIT]
+            prev_n, prev = n, prev * _product(prev_n + 1, n)
+        results[n] = prev
+    return [results[n] for n in ns]
+
+
+def perm(n, k):
+    """
+    Number of ordered selections of k items out of n: n! / (n - k)!.
+
+    Only the k factors n, n-1, ..., n-k+1 are multiplied.
+
+    Examples:
+        >>> perm(5, 2)
+        20
+    """
+    n, k = _check(n), _check(k)
+    if k > n:
+        return 0
+    if n <= TABLE_LIMIT:
+        _grow(n)
+        return _table[n] // _table[n - k]
+    return _product(n - k + 1, n)
+
+
+def comb(n, k):
+    """
+    Number of ways to choose k items out of n: n! / (k! (n - k)!).
+
+    Examples:
+        >>> comb(5, 2)
+        10
+        >>> comb(100_000, 3)
+        166661666700000
+    """
+    n, k = _check(n), _check(k)
+    if k > n:
+        return 0
+    k = min(k, n - k)
+    if n <= TABLE_LIMIT:
+        _grow(n)
+        return _table[n] // (_table[k] * _table[n - k])
+    return _product(n - k + 1, n) // factorial(k)
+
+
+def log_factorial(n):
+    """
+    Natural logarithm of n!, for numbers or NumPy arrays.
+
+    Uses the log-gamma function (log n! = lgamma(n + 1)), so it is fast
+    for any n and never overflows.
+
+    Args:
+        n (int, float or array-like): Non-negative value(s).
+
+    Returns:
+        float or numpy.ndarray: log(n!).
+
+    Examples:
+        >>> round(float(log_factorial(5)), 6)
+        4.787492
+    """
+    values = np.asarray(n, dtype=np.float64)
+    if np.any(values < 0):
+        raise ValueError("factorial is not defined for negative numbers")
+    return np.asarray(gammaln(values + 1), dtype=np.float64)[()]
+
+
+def log_comb(n, k):
+    """
+    Natural logarithm of comb(n, k), for numbers or NumPy arrays.
+
+    Examples:
+        >>> round(float(np.exp(log_comb(5, 2))))
+        10
+    """
+    n = np.asarray(n, dtype=np.float64)
+    k = np.asarray(k, dtype=np.float64)
+    return log_factorial(n) - log_factorial(k) - log_factorial(n - k)
+
+
+if __name__ == "__main__":
+    print(factorial(5))
+    print(factorial(20_000).bit_length(), "bits in 20000!")
+    print(factorial_many([10, 3, 7]))
+    print(perm(1_000_000, 3), comb(1_000_000, 3))
+    print(log_factorial(np.array([10, 100, 1000])))
@@ -1,4 +1,5 @@
 # Question: Write a recursive function to compute the factorial of a number.
+# (Recursion stops near n=1000; combinatorics.py has an iterative, cached version.)
 def factorial(n):
     if n <= 1:
         return 1
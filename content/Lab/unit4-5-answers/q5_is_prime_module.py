@@ -1,19 +1,108 @@
 """
 Module: q5_is_prime_module
 
-Provides a function to check if a number is prime.
+Provides functions to check if a number is prime.
+
+Small numbers are answered from a cached sieve of Eratosthenes that grows
+on demand, one segment at a time. Numbers beyond the sieve are checked with
+a deterministic Miller-Rabin test, which is exact for every 64-bit integer.
 """
 
+from math import isqrt
+
+# Numbers up to this limit are answered from the sieve; larger ones use Miller-Rabin.
+SIEVE_LIMIT = 10 ** 7
+SEGMENT_SIZE = 1 << 18
+
+# Witnesses that make Miller-Rabin deterministic for all n < 3.3 * 10**24.
+_MR_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+# _sieve[i] is 1 when the odd number 2*i + 1 is prime (even numbers are not stored).
+_sieve = bytearray()
+_sieve_limit = 0
+
+
+def _extend_sieve(limit):
+    """
+    Grow the cached sieve so that it covers every number up to `limit`.
+
+    Only odd numbers are stored, and the new range is sieved in segments of
+    SEGMENT_SIZE so that memory stays bounded while the cache grows.
+    """
+    global _sieve, _sieve_limit
+    if limit <= _sieve_limit:
+        return
+    # Grow at least geometrically so that ascending lookups (is_prime(1),
+    # is_prime(2), ...) extend the sieve only O(log n) times.
+    limit = max(limit, min(SIEVE_LIMIT, 2 * _sieve_limit))
+    if not _sieve:
+        _sieve = bytearray([0])  # 1 is not prime
+        _sieve_limit = 1
+    root = isqrt(limit)
+    if root > _sieve_limit:
+        # The segments need every odd prime up to sqrt(limit); sieve those first.
+        _extend_sieve(root)
+    odd_primes = [2 * i + 1 for i in range(1, (root - 1) // 2 + 1) if _sieve[i]]
+
+    low = len(_sieve)  # index of the first odd number not yet sieved
+    high_index = (limit - 1) // 2 + 1
+    while low < high_index:
+        high = min(low + SEGMENT_SIZE, high_index)
+        segment = bytearray([1]) * (high - low)
+        for p in odd_primes:
+            # First odd multiple of p (at least p*p) inside [2*low + 1, 2*high - 1].
+            start = max(p * p, ((2 * low + 1 + p - 1) // p) * p)
+            if start % 2 == 0:
+                start += p
+            first = (start - 1) // 2 - low
+            if first < len(segment):
+                count = (len(segment) - 1 - first) // p + 1
+                segment[first::p] = bytes(count)
+        _sieve += segment
+        low = high
+    _sieve_limit = 2 * len(_sieve) - 1
+
+
+def _miller_rabin(n):
+    """Deterministic Miller-Rabin test for odd n > 41."""
+    d = n - 1
+    s = 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in _MR_BASES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _whole(n):
+    """Return n as an int, or None if it is not a whole number."""
+    if isinstance(n, int):
+        return n
+    # Whole-number floats and NumPy integers index the sieve as ints.
+    if n != int(n):
+        return None
+    return int(n)
+
+
 def is_prime(n):
     """
     Determine whether a number is prime.
-    
+
     Args:
         n (int): The number to check for primality.
-    
+
     Returns:
         bool: True if n is a prime number, False otherwise.
-    
+
     Examples:
         >>> is_prime(2)
         True
@@ -23,10 +112,71 @@ def is_prime(n):
         False
         >>> is_prime(4)
         False
+        >>> is_prime(18446744073709551557)
+        True
+        >>> is_prime(17.0)
+        True
     """
     if n <= 1:
         return False
-    for i in range(2, int(n ** 0.5) + 1):
-        if n % i == 0:
+    n = _whole(n)
+    if n is None:
+        return False
+    if n % 2 == 0:
+        return n == 2
+    if n <= _sieve_limit:
+        return bool(_sieve[n // 2])
+    if n <= SIEVE_LIMIT:
+        _extend_sieve(n)
+        return bool(_sieve[n // 2])
+    for p in _MR_BASES:
+        if n % p == 0:
             return False
-    return True
+    return _miller_rabin(n)
+
+
+def is_prime_many(numbers):
+    """
+    Check a batch of numbers for primality.
+
+    The sieve is extended once to cover the largest in-range number, so the
+    whole batch is answered with one lookup each.
+
+    Args:
+        numbers (iterable of int): The numbers to check.
+
+    Returns:
+        list of bool: True for each prime number, in the same order.
+
+    Examples:
+        >>> is_prime_many([1, 2, 9, 11, 1000003])
+        [False, True, False, True, True]
+        >>> is_prime_many([17.0, 17.5])
+        [True, False]
+    """
+    numbers = [n if n <= 1 else _whole(n) for n in numbers]
+    in_range = [n for n in numbers if n is not None and n <= SIEVE_LIMIT]
+    if in_range:
+        _extend_sieve(max(in_range))
+    return [n is not None and is_prime(n) for n in numbers]
+
+
+def primes_up_to(limit):
+    """
+    List all prime numbers less than or equal to `limit`.
+
+    Args:
+        limit (int): The largest number to include.
+
+    Returns:
+        list of int: The primes in increasing order.
+
+    Examples:
+        >>> primes_up_to(20)
+        [2, 3, 5, 7, 11, 13, 17, 19]
+    """
+    if limit < 2:
+        return []
+    _extend_sieve(limit)
+    last = (limit - 1) // 2
+    return [2] + [2 * i + 1 for i in range(1, last + 1) if _sieve[i]]
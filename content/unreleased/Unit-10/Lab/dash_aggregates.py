@@ -0,0 +1,108 @@
+# Pre-aggregated data store for Dash scatter plots
+#
+# - The data is binned once into a fine 2-D histogram per colour group.
+# - A view (x/y range + selected groups) is answered from that histogram:
+#   if it holds too many points it is drawn as a density heatmap, otherwise
+#   the individual points in the view are sent.
+# - Figures are memoized per view, with an eviction limit, so users looking
+#   at the same view share one rendered figure.
+
+from functools import lru_cache
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+class AggregateStore:
+    """
+    Serve scatter-or-density figures for any zoom level of a large table.
+
+    Args:
+        df (pandas.DataFrame): The data.
+        x, y (str): Numeric columns on the axes.
+        color (str, optional): Categorical column used for colour / filtering.
+        max_points (int): Largest number of points sent as a scatter.
+        grid (int): Resolution of the pre-computed histogram along each axis.
+        bins (int): Approximate number of heatmap cells along each axis.
+        cache_size (int): Number of figures kept in the memo cache.
+    """
+
+    def __init__(self, df, x, y, color=None, max_points=5000, grid=1024, bins=128, cache_size=64):
+        self.df = df
+        self.x, self.y, self.color = x, y, color
+        self.max_points = max_points
+        self.bins = bins
+        xs = df[x].to_numpy(dtype=float)
+        ys = df[y].to_numpy(dtype=float)
+        self.xedges = np.linspace(np.nanmin(xs), np.nanmax(xs), grid + 1)
+        self.yedges = np.linspace(np.nanmin(ys), np.nanmax(ys), grid + 1)
+        self.groups = sorted(df[color].dropna().unique().tolist()) if color else [None]
+        # Summed-area table per group: counting the points in any view is O(1).
+        self._tables = {}
+        for group in self.groups:
+            mask = (df[color] == group).to_numpy() if color else np.ones(len(df), bool)
+            hist = np.histogram2d(xs[mask], ys[mask], bins=[self.xedges, self.yedges])[0]
+            table = np.zeros((grid + 1, grid + 1))
+            table[1:, 1:] = hist.cumsum(axis=0).cumsum(axis=1)
+            self._tables[group] = table
+        self.figure = lru_cache(maxsize=cache_size)(self._figure)
+
+    def view(self, x_range=None, y_range=None, groups=None):
+        """
+        Snap a requested view to the histogram grid so that nearby views
+        share the same cache entry.
+
+        Returns:
+            tuple: (x index range, y index range, groups) usable as figure() key.
+        """
+        def snap(edges, rng):
+            if rng is None:
+                return 0, len(edges) - 1
+            lo = int(np.clip(np.searchsorted(edges, rng[0], side="right") - 1, 0, len(edges) - 2))
+            hi = int(np.clip(np.searchsorted(edges, rng[1], side="left"), lo + 1, len(edges) - 1))
+            return lo, hi
+
+        groups = tuple(sorted(groups)) if groups is not None else tuple(self.groups)
+        return snap(self.xedges, x_range), snap(self.yedges, y_range), groups
+
+    def count(self, xi, yi, groups):
+        """Number of points inside a snapped view."""
+        total = 0.0
+        for group in groups:
+            t = self._tables[group]
+            total += t[xi[1], yi[1]] - t[xi[0], yi[1]] - t[xi[1], yi[0]] + t[xi[0], yi[0]]
+        return int(total)
+
+    def _figure(self, xi, yi, groups):
+        x0, x1 = self.xedges[xi[0]], self.xedges[xi[1]]
+        y0, y1 = self.yedges[yi[0]], self.yedges[yi[1]]
+        n = self.count(xi, yi, groups)
+        if n <= self.max_points:
+            d = self.df
+            mask = d[self.x].between(x0, x1) & d[self.y].between(y0, y1)
+            if self.color:
+                mask &= d[self.color].isin(groups)
+            fig = px.scatter(d[mask], x=self.x, y=self.y, color=self.color)
+        else:
+            counts, fx, fy = self._density(xi, yi, groups)
+            fig = go.Figure(go.Heatmap(x=(fx[:-1] + fx[1:]) / 2, y=(fy[:-1] + fy[1:]) / 2,
+                                       z=counts.T, colorscale="Viridis", colorbar={"title": "points"}))
+            fig.update_layout(xaxis_title=self.x, yaxis_title=self.y)
+        fig.update_layout(title=f"{n:,} points", uirevision="keep-zoom")
+        fig.update_xaxes(range=[x0, x1])
+        fig.update_yaxes(range=[y0, y1])
+        return fig
+
+    def _density(self, xi, yi, groups):
+        # Recover the counts of the view from the summed-area tables, then
+        # merge neighbouring grid cells down to about `bins` per axis.
+        sx = max(1, (xi[1] - xi[0]) // self.bins)
+        sy = max(1, (yi[1] - yi[0]) // self.bins)
+        xs = np.append(np.arange(xi[0], xi[1], sx), xi[1])
+        ys = np.append(np.arange(yi[0], yi[1], sy), yi[1])
+        counts = 0
+        for group in groups:
+            t = self._tables[group][np.ix_(xs, ys)]
+            counts = counts + np.diff(np.diff(t, axis=0), axis=1)
+        return counts, self.xedges[xs], self.yedges[ys]
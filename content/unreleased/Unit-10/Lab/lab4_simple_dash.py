@@ -1,17 +1,37 @@
 # Lab 4: Simple Dashboard with Plotly Dash
 
 import dash
-from dash import dcc, html
+from dash import dcc, html, Input, Output
 import plotly.express as px
 
+from dash_aggregates import AggregateStore
+
 app = dash.Dash(__name__)
 data = px.data.iris()
-fig = px.scatter(data, x='sepal_width', y='sepal_length', color='species')
+
+# Large datasets are drawn as a density heatmap until the user zooms in
+# far enough; figures for the same view are cached and shared.
+store = AggregateStore(data, x='sepal_width', y='sepal_length', color='species')
 
 app.layout = html.Div([
     html.H1('Iris Dashboard'),
-    dcc.Graph(figure=fig)
+    dcc.Dropdown(store.groups, store.groups, multi=True, id='species'),
+    dcc.Graph(id='scatter')
 ])
 
+
+@app.callback(Output('scatter', 'figure'),
+              Input('species', 'value'),
+              Input('scatter', 'relayoutData'))
+def update_figure(species, relayout):
+    relayout = relayout or {}
+    x_range = y_range = None
+    if 'xaxis.range[0]' in relayout:
+        x_range = (relayout['xaxis.range[0]'], relayout['xaxis.range[1]'])
+    if 'yaxis.range[0]' in relayout:
+        y_range = (relayout['yaxis.range[0]'], relayout['yaxis.range[1]'])
+    return store.figure(*store.view(x_range, y_range, species))
+
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,235 @@
+"""
+Module: json_stream
+
+Read large JSON files one record at a time.
+
+Supports a top-level JSON array (like posts.json) and JSON Lines files
+(one object per line, like requests.jsonl). Only the record being decoded
+is held in memory, so memory use stays flat however big the file is. A
+record that cannot be decoded is reported and skipped instead of aborting
+the whole file.
+"""
+
+import json
+import re
+import warnings
+from collections import namedtuple
+
+import pandas as pd
+
+RecordError = namedtuple("RecordError", ["index", "message", "text"])
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"\s*")
+# Characters that matter when looking for the end of an array element.
+_structure = re.compile(r'["\\\[\]{},]')
+
+
+def _report(errors, error):
+    if errors is None:
+        warnings.warn(f"Skipping record {error.index}: {error.message}")
+    else:
+        errors.append(error)
+
+
+def _element_end(buf, pos):
+    """
+    Index of the ',' or ']' that ends the array element starting at `pos`,
+    or None if the element is not complete in `buf` yet.
+    """
+    depth = 0
+    in_string = False
+    escaped_at = -1
+    for m in _structure.finditer(buf, pos):
+        ch, i = m.group(), m.start()
+        if in_string:
+            if ch == "\\" and escaped_at != i:
+                escaped_at = i + 1
+            elif ch == '"' and escaped_at != i:
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "[{":
+            depth += 1
+        elif ch in "]}":
+            if depth == 0:
+                return i
+            depth -= 1
+        elif ch == "," and depth == 0:
+            return i
+    return None
+
+
+def _iter_array(f, errors, chunk_size):
+    buf = ""
+    pos = 0
+    eof = False
+
+    def read_more():
+        # Keep the unread part and add at least a chunk; a large element
+        # doubles the buffer, so rescanning it stays linear overall.
+        nonlocal buf, pos, eof
+        more = f.read(max(chunk_size, len(buf) - pos))
+        eof = not more
+        buf = buf[pos:] + more
+        pos = 0
+
+    def next_char():
+        # Skip whitespace, reading as much as needed; "" at the end of the file.
+        nonlocal pos
+        while True:
+            pos = _whitespace.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            read_more()
+
+    if next_char() != "[":
+        raise ValueError("Expected a JSON array or a JSON Lines file")
+    pos += 1
+    if next_char() == "]":
+        return
+    index = 0
+    while True:
+        next_char()
+        try:
+            record, end = _decoder.raw_decode(buf, pos)
+            after = _whitespace.match(buf, end).end()
+        except json.JSONDecodeError:
+            after = len(buf)
+        if after == len(buf) or buf[after] not in ",]":
+            # The element may run past the buffer (a number such as "1.5e10"
+            # decodes as 1 from "1.") or be malformed: read until its ','
+            # or ']' is in the buffer and decode it again on its own.
+            stop = _element_end(buf, pos)
+            while stop is None and not eof:
+                read_more()
+                stop = _element_end(buf, pos)
+            try:
+                record, end = _decoder.raw_decode(buf, pos)
+                if stop is None or _whitespace.match(buf, end).end() != stop:
+                    raise json.JSONDecodeError("Expecting ',' delimiter", buf, end)
+            except json.JSONDecodeError as exc:
+                _report(errors, RecordError(index, str(exc), buf[pos:stop].strip()))
+                index += 1
+                if stop is None or buf[stop] == "]":
+                    return
+                pos = stop + 1
+                continue
+            after = stop
+        yield index, record
+        index += 1
+        if buf[after] == "]":
+            return
+        pos = after + 1
+
+
+def _iter_lines(f, errors):
+    for index, line in enumerate(f):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield index, json.loads(line)
+        except json.JSONDecodeError as exc:
+            _report(errors, RecordError(index, str(exc), line))
+
+
+def _indexed_records(path, lines=None, errors=None, chunk_size=1 << 16):
+    if lines is None:
+        lines = path.endswith((".jsonl", ".ndjson"))
+    with open(path, "r", encoding="utf-8") as f:
+        if lines:
+            yield from _iter_lines(f, errors)
+        else:
+            yield from _iter_array(f, errors, chunk_size)
+
+
+def iter_records(path, lines=None, errors=None, chunk_size=1 << 16):
+    """
+    Yield the records of a JSON array or JSON Lines file one at a time.
+
+    Args:
+        path (str): The file to read.
+        lines (bool, optional): True for JSON Lines, False for a JSON array.
+            By default .jsonl / .ndjson files are read as JSON Lines.
+        errors (list, optional): Bad records are appended here as
+            RecordError(index, message, text). If not given, a warning is
+            issued for each one.
+        chunk_size (int): Characters read from the file at a time.
+
+    Yields:
+        The decoded records (usually dicts).
+    """
+    for _, record in _indexed_records(path, lines, errors, chunk_size):
+        yield record
+
+
+def _bad_rows(df, schema):
+    """(position, error) for each row of `df` that cannot be cast to `schema`."""
+    try:
+        df.astype(schema)
+        return []
+    except (TypeError, ValueError) as exc:
+        if len(df) == 1:
+            return [(0, exc)]
+    # Bisect, so a batch with a few bad rows needs only a few extra casts.
+    mid = len(df) // 2
+    return _bad_rows(df.iloc[:mid], schema) + [(mid + i, exc) for i, exc in _bad_rows(df.iloc[mid:], schema)]
+
+
+def _to_frame(batch, schema, errors):
+    df = pd.DataFrame.from_records([record for _, record in batch], columns=list(schema))
+    try:
+        return df.astype(schema)
+    except (TypeError, ValueError):
+        pass
+    bad = _bad_rows(df, schema)
+    for row, exc in bad:
+        index, record = batch[row]
+        _report(errors, RecordError(index, f"does not match the schema: {exc}", json.dumps(record)))
+    return df.drop(index=df.index[[row for row, _ in bad]]).astype(schema).reset_index(drop=True)
+
+
+def iter_frames(path, schema, batch_size=10_000, errors=None, **options):
+    """
+    Yield DataFrames of at most `batch_size` records with fixed columns.
+
+    Args:
+        path (str): The file to read.
+        schema (dict): Column name -> dtype. Missing keys become NaN and
+            extra keys are dropped, so every batch has the same columns.
+            A record that cannot be cast to the schema (including a missing
+            key for an integer column, which has no NaN) is reported like
+            a record that cannot be decoded, and skipped.
+        batch_size (int): Records per DataFrame.
+        errors (list, optional): Bad records are appended here as
+            RecordError(index, message, text); see iter_records.
+        **options: Passed to iter_records (lines, chunk_size).
+
+    Yields:
+        pandas.DataFrame: The next batch of records.
+    """
+    batch = []
+    for index, record in _indexed_records(path, errors=errors, **options):
+        if not isinstance(record, dict):
+            _report(errors, RecordError(index, "expected a JSON object", json.dumps(record)))
+            continue
+        batch.append((index, record))
+        if len(batch) == batch_size:
+            yield _to_frame(batch, schema, errors)
+            batch = []
+    if batch:
+        yield _to_frame(batch, schema, errors)
+
+
+if __name__ == "__main__":
+    errors = []
+    try:
+        for post in iter_records("content/unreleased/Unit-6/unit6_code_examples/posts.json", errors=errors):
+            print(f"Title: {post['title']}")
+            print(f"Body: {post['body']}")
+            print()
+    except FileNotFoundError:
+        print("posts.json file not found.")
+    finally:
+        print(f"Task finished ({len(errors)} bad records skipped).")
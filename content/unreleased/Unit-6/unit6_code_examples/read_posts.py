@@ -1,5 +1,8 @@
 import json
+import time
 
+start = time.perf_counter()
+count = 0
 try:
     with open("content/unreleased/Unit-6/unit6_code_examples/posts.json", "r", encoding="utf-8") as f:
         posts = json.load(f)
@@ -7,6 +10,7 @@ try:
         print(f"Title: {post['title']}")
         print(f"Body: {post['body']}")
         print()
+        count += 1
 except FileNotFoundError:
     print("posts.json file not found.")
 except json.JSONDecodeError:
@@ -14,4 +18,4 @@ except json.JSONDecodeError:
 except Exception as e:
     print(f"An error occurred: {e}")
 finally:
-    print("Task finished.")
+    print(f"Task finished: {count} posts in {time.perf_counter() - start:.3f} s.")
@@ -0,0 +1,244 @@
+"""
+Module: compact
+
+Shrink DataFrames (and rows) to the smallest types that hold their data.
+
+After read_csv / read_excel / read_json, text columns such as Name and
+Subject are stored as one Python string per row, IDs as int64 and grades as
+float64. compact() picks smaller types column by column:
+
+- repeated text -> category (each distinct value stored once)
+- ISO date text or datetimes at midnight -> date32 (4 bytes, needs pyarrow;
+  otherwise datetime64 with second resolution)
+- integers (IDs) -> int32 when they fit; not narrower, so arithmetic such
+  as StudentID * 100 does not wrap around
+- whole numbers too large for float32 to hold exactly (IDs read as float64
+  because of NaN) -> nullable Int32 / Int64
+- other floats (grades) -> float32. float32 keeps about 7 significant
+  digits, so 72.3 is stored as 72.30000305 and 123456.78 as 123456.78125;
+  pass lossless=True to keep float64 wherever float32 would change a value
+
+savings() reports the bytes saved per column. For row-oriented code, such
+as the dictionaries of q9_dict_scores.py, record_type() builds small
+classes with __slots__, which need no per-object __dict__.
+"""
+
+import re
+from dataclasses import astuple, make_dataclass
+
+import numpy as np
+import pandas as pd
+from pandas.api import types
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is optional
+    pa = None
+
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+def _is_text(series):
+    return types.is_object_dtype(series.dtype) or types.is_string_dtype(series.dtype)
+
+
+def _as_date(series):
+    """The column as dates, or None if it does not hold plain dates."""
+    if types.is_datetime64_dtype(series.dtype):
+        dates = series
+    elif _is_text(series):
+        sample = series.dropna()
+        if sample.empty or not all(isinstance(v, str) and _ISO_DATE.match(v) for v in sample.iloc[:100]):
+            return None
+        try:
+            dates = pd.to_datetime(series, format="ISO8601")
+        except (ValueError, TypeError):
+            return None
+    else:
+        return None
+    if getattr(dates.dt, "tz", None) is not None or (dates.dropna() != dates.dropna().dt.normalize()).any():
+        return None  # times of day or time zones would be lost
+    if pa is not None:
+        return dates.astype(pd.ArrowDtype(pa.date32()))
+    return dates.astype("datetime64[s]")
+
+
+def _compact_int(series):
+    if series.dtype.itemsize <= 4:
+        return series
+    info = np.iinfo(np.int32)
+    present = series.dropna()
+    if len(present) and (present.min() < info.min or present.max() > info.max):
+        return series
+    return series.astype("Int32" if isinstance(series.dtype, pd.api.extensions.ExtensionDtype) else np.int32)
+
+
+def _compact_float(series, lossless=False):
+    if series.dtype.itemsize <= 4:
+        return series
+    values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+    finite = values[np.isfinite(values)]
+    largest = np.abs(finite).max() if len(finite) else 0.0
+    if 2 ** 24 < largest < 2 ** 63 and (finite == np.trunc(finite)).all() and not np.isinf(values).any():
+        # Whole numbers float32 cannot hold exactly (IDs that became floats
+        # because of missing values): a nullable integer keeps every digit.
+        return series.astype("Int32" if largest <= np.iinfo(np.int32).max else "Int64")
+    if largest > np.finfo(np.float32).max:
+        return series  # would overflow to inf
+    if lossless and not np.array_equal(values.astype(np.float32).astype(np.float64), values, equal_nan=True):
+        return series
+    return series.astype(np.float32)
+
+
+def compact_column(series, category_ratio=0.5, lossless=False):
+    """
+    Convert one column to the smallest type that holds its values.
+
+    Args:
+        series (pandas.Series): The column.
+        category_ratio (float): Text columns with at most this share of
+            distinct values (distinct / rows) become categories.
+        lossless (bool): Keep float64 unless every value survives the
+            round trip through float32.
+
+    Returns:
+        pandas.Series: The converted column (or `series` itself if no
+        smaller type fits).
+    """
+    dates = _as_date(series)
+    if dates is not None:
+        return dates
+    if types.is_bool_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    if types.is_integer_dtype(series.dtype):
+        return _compact_int(series)
+    if types.is_float_dtype(series.dtype):
+        return _compact_float(series, lossless)
+    if _is_text(series) and len(series) and series.nunique() <= category_ratio * len(series):
+        return series.astype("category")
+    return series
+
+
+def compact(df, category_ratio=0.5, columns=None, lossless=False):
+    """
+    Return a copy of `df` with every column in its smallest type.
+
+    Args:
+        df (pandas.DataFrame): The data.
+        category_ratio (float): See compact_column.
+        columns (list of str, optional): Only convert these columns.
+        lossless (bool): See compact_column.
+
+    Returns:
+        pandas.DataFrame: The compacted data.
+
+    Examples:
+        >>> df = pd.DataFrame({"StudentID": [1001, 1002], "Subject": ["Math", "Math"],
+        ...                    "Grade": [86.0, 91.0], "Date": ["2025-05-15", "2025-05-17"]})
+        >>> [str(t) for t in compact(df).dtypes.iloc[:3]]
+        ['int32', 'category', 'float32']
+        >>> (compact(df)["StudentID"] * 100).tolist()
+        [100100, 100200]
+        >>> compact_column(pd.Series([86.0, None, 91.0])).add(50).tolist()
+        [136.0, nan, 141.0]
+        >>> compact_column(pd.Series([2025000123.0, None, 2025000125.0])).tolist()
+        [2025000123, <NA>, 2025000125]
+        >>> compact_column(pd.Series([123456.78])).dtype
+        dtype('float32')
+        >>> compact_column(pd.Series([123456.78]), lossless=True).dtype
+        dtype('float64')
+    """
+    out = df.copy(deep=False)
+    for col in columns or df.columns:
+        out[col] = compact_column(df[col], category_ratio, lossless)
+    return out
+
+
+def savings(before, after):
+    """
+    Memory used per column before and after compacting.
+
+    Args:
+        before (pandas.DataFrame): The original data.
+        after (pandas.DataFrame): The compacted data.
+
+    Returns:
+        pandas.DataFrame: dtype and bytes before / after, bytes saved and
+        the shrink factor per column, with a "Total" row.
+    """
+    used_before = before.memory_usage(index=False, deep=True)
+    used_after = after.memory_usage(index=False, deep=True)
+    report = pd.DataFrame({
+        "dtype_before": before.dtypes.astype(str),
+        "dtype_after": after.dtypes.astype(str),
+        "bytes_before": used_before,
+        "bytes_after": used_after,
+    })
+    report.loc["Total"] = ["", "", used_before.sum(), used_after.sum()]
+    report["bytes_saved"] = report["bytes_before"] - report["bytes_after"]
+    report["factor"] = (report["bytes_before"] / report["bytes_after"]).round(2)
+    return report
+
+
+def record_type(name, fields):
+    """
+    Create a small row class with __slots__ (a slotted dataclass).
+
+    Instances store their fields in fixed slots instead of a per-object
+    __dict__, which keeps millions of rows in Python much smaller.
+
+    Args:
+        name (str): Class name.
+        fields (list of str): Field names, e.g. the DataFrame columns.
+
+    Returns:
+        type: The new class (with __init__, __repr__ and __eq__).
+
+    Examples:
+        >>> Score = record_type("Score", ["name", "score"])
+        >>> Score("Asha", 88)
+        Score(name='Asha', score=88)
+        >>> hasattr(Score("Asha", 88), "__dict__")
+        False
+    """
+    return make_dataclass(name, list(fields), slots=True)
+
+
+def to_records(df, cls=None):
+    """
+    Turn the rows of a DataFrame into slotted records.
+
+    Args:
+        df (pandas.DataFrame): The data.
+        cls (type, optional): A class made by record_type (default: a new
+            "Record" class with the DataFrame's columns).
+
+    Returns:
+        list: One record per row.
+    """
+    cls = cls or record_type("Record", df.columns)
+    return [cls(*row) for row in df.itertuples(index=False, name=None)]
+
+
+def from_records(records):
+    """Build a DataFrame from records made by record_type / to_records."""
+    if not records:
+        return pd.DataFrame()
+    fields = type(records[0]).__slots__
+    return pd.DataFrame([astuple(r) for r in records], columns=list(fields))
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("../grades.csv")
+    small = compact(df)
+    print(small.dtypes)
+    print(savings(df, small))
+
+    # Same report for the records of q4_students_json.py
+    students = pd.read_json("../students.json")
+    print(savings(students, compact(students)))
+
+    # Rows as slotted records instead of dictionaries (see q9_dict_scores.py)
+    Grade = record_type("Grade", df.columns)
+    rows = to_records(df, Grade)
+    print([(r.Name, r.Grade) for r in rows if r.Grade > 80])
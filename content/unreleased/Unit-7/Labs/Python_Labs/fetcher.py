@@ -0,0 +1,273 @@
+"""
+Module: fetcher
+
+Download remote datasets concurrently and keep them in a local cache.
+
+fetch_many() downloads many URLs at the same time: each download runs
+urllib.request in a worker thread, with at most `concurrency` in flight
+and at most `per_host` to one server. urllib follows redirects, speaks
+HTTPS and honours the HTTP(S)_PROXY / NO_PROXY settings, just like
+pd.read_csv(url). Every download is stored under CACHE_DIR/http together
+with its ETag and Last-Modified headers:
+
+- a copy checked less than `max_age` seconds ago is used without any request
+- an older copy is revalidated with If-None-Match / If-Modified-Since, and
+  a "304 Not Modified" answer costs no download
+- in offline mode (offline=True or DSC481_OFFLINE=1) only the cache is used
+
+read_csv() and read_json() are drop-in replacements for the pandas readers
+in q2_iris.py and q5_api_json.py. local_server() serves a folder over HTTP
+on localhost, as a stand-in for the real servers when testing offline.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from frame_cache import CACHE_DIR
+
+HTTP_CACHE_DIR = os.path.join(CACHE_DIR, "http")
+OFFLINE = os.environ.get("DSC481_OFFLINE", "") not in ("", "0")
+MAX_AGE = 24 * 3600
+
+
+class FetchError(OSError):
+    """A URL could not be downloaded (or is not cached in offline mode)."""
+
+
+def _download(url, headers, target, timeout):
+    """
+    GET `url` into the file `target` (blocking; runs in a worker thread).
+
+    Returns:
+        tuple: (status, response headers). The body is only written for 200.
+    """
+    request = urllib.request.Request(url, headers={"User-Agent": "dsc481-fetcher", **headers})
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            with open(target, "wb") as f:
+                shutil.copyfileobj(response, f, 1 << 20)
+            return response.status, response.headers
+    except urllib.error.HTTPError as exc:  # includes 304 Not Modified
+        exc.close()
+        return exc.code, exc.headers
+
+
+class Fetcher:
+    """
+    Concurrent, cached HTTP downloader. Use it with `async with`.
+
+    Args:
+        cache_dir (str, optional): Cache folder (default: HTTP_CACHE_DIR).
+        concurrency (int): Most downloads in flight at the same time.
+        per_host (int): Most downloads from one server at the same time.
+        timeout (float): Seconds allowed for connecting and for each read.
+        max_age (float): Seconds a cached copy is trusted before it is
+            revalidated with the server.
+        offline (bool, optional): Only use the cache (default: OFFLINE).
+    """
+
+    def __init__(self, cache_dir=None, concurrency=32, per_host=6, timeout=30.0,
+                 max_age=MAX_AGE, offline=None):
+        self.cache_dir = cache_dir or HTTP_CACHE_DIR
+        self.timeout = timeout
+        self.max_age = max_age
+        self.offline = OFFLINE if offline is None else offline
+        self.per_host = per_host
+        self.stats = {"cached": 0, "revalidated": 0, "downloaded": 0}
+        self._limit = asyncio.Semaphore(concurrency)
+        self._host_limits = {}
+        # Own threads, so `concurrency` downloads can really run at once.
+        self._threads = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="fetcher")
+        self._pending = {}  # url -> task, so one URL is only fetched once at a time
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._threads.shutdown(wait=False, cancel_futures=True)
+
+    def cache_path(self, url):
+        """Where the cached copy of `url` is (or would be) stored."""
+        name = hashlib.sha1(url.encode()).hexdigest()[:20]
+        ext = os.path.splitext(urlsplit(url).path)[1][:10]
+        return os.path.join(self.cache_dir, name + ext)
+
+    async def fetch(self, url):
+        """
+        Make sure `url` is in the cache.
+
+        Returns:
+            str: Path of the cached file.
+
+        Raises:
+            FetchError: On HTTP errors, network errors, or a missing cache
+                entry in offline mode.
+        """
+        if url not in self._pending:
+            self._pending[url] = asyncio.ensure_future(self._fetch(url))
+            self._pending[url].add_done_callback(lambda _: self._pending.pop(url, None))
+        return await asyncio.shield(self._pending[url])
+
+    async def fetch_many(self, urls):
+        """Fetch all URLs concurrently; returns their cache paths in order."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
+
+    async def _fetch(self, url):
+        path = self.cache_path(url)
+        meta = _read_meta(path)
+        if meta is not None and (self.offline or time.time() - meta["checked"] < self.max_age):
+            self.stats["cached"] += 1
+            return path
+        if self.offline:
+            raise FetchError(f"{url} is not cached and offline mode is on")
+        if urlsplit(url).scheme not in ("http", "https"):
+            raise FetchError(f"{url}: only http and https URLs are supported")
+
+        headers = {}
+        if meta is not None:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        tmp = f"{path}.{os.getpid()}.{id(asyncio.current_task())}.tmp"
+        host = urlsplit(url).hostname
+        limit = self._host_limits.setdefault(host, asyncio.Semaphore(self.per_host))
+        try:
+            async with self._limit, limit:
+                status, response = await asyncio.get_running_loop().run_in_executor(
+                    self._threads, _download, url, headers, tmp, self.timeout)
+        except (urllib.error.URLError, OSError, ValueError) as exc:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise FetchError(f"{url}: {getattr(exc, 'reason', None) or exc}") from exc
+
+        if status == 304 and meta is not None:
+            meta["checked"] = time.time()
+            _write_meta(path, meta)
+            self.stats["revalidated"] += 1
+            return path
+        if status != 200:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise FetchError(f"{url}: HTTP {status}")
+
+        os.replace(tmp, path)
+        last_modified = response.get("Last-Modified")
+        if last_modified:
+            with contextlib.suppress(TypeError, ValueError, OverflowError):
+                mtime = parsedate_to_datetime(last_modified).timestamp()
+                os.utime(path, (mtime, mtime))
+        _write_meta(path, {"url": url, "etag": response.get("ETag"),
+                           "last_modified": last_modified, "checked": time.time()})
+        self.stats["downloaded"] += 1
+        return path
+
+
+def _read_meta(path):
+    try:
+        with open(path + ".json", encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return meta if os.path.exists(path) else None
+
+
+def _write_meta(path, meta):
+    tmp = f"{path}.json.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, path + ".json")
+
+
+def fetch_many(urls, **options):
+    """
+    Download (or find in the cache) many URLs concurrently.
+
+    Args:
+        urls (list of str): The URLs.
+        **options: Passed to Fetcher (e.g. concurrency, offline, max_age).
+
+    Returns:
+        list of str: The cached file paths, in the order of `urls`.
+    """
+    async def run():
+        async with Fetcher(**options) as fetcher:
+            return await fetcher.fetch_many(urls)
+
+    return asyncio.run(run())
+
+
+def fetch(url, **options):
+    """Download (or find in the cache) one URL; returns the cached file path."""
+    return fetch_many([url], **options)[0]
+
+
+def read_csv(url, offline=None, **kwargs):
+    """pandas.read_csv through the cache; `kwargs` go to pandas."""
+    return pd.read_csv(fetch(url, offline=offline), **kwargs)
+
+
+def read_json(url, offline=None, **kwargs):
+    """pandas.read_json through the cache; `kwargs` go to pandas."""
+    return pd.read_json(fetch(url, offline=offline), **kwargs)
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like a real server
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextlib.contextmanager
+def local_server(directory, port=0):
+    """
+    Serve the files of `directory` on localhost while the block runs.
+
+    The server answers If-Modified-Since with 304, like a real static file
+    host, so caching can be tested without a network.
+
+    Yields:
+        str: Base URL, e.g. "http://127.0.0.1:54321/".
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), partial(_QuietHandler, directory=directory))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}/"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    # The lab files served locally, fetched concurrently, then from the cache
+    with tempfile.TemporaryDirectory() as cache, local_server("..") as base:
+        urls = [base + name for name in ("grades.csv", "students.json")]
+        for run in ("first run", "second run"):
+            paths = fetch_many(urls, cache_dir=cache)
+            print(run, paths)
+        async def revalidate():
+            async with Fetcher(cache_dir=cache, max_age=0) as fetcher:
+                await fetcher.fetch_many(urls)
+                return fetcher.stats
+        print("revalidated:", asyncio.run(revalidate()))
+        print(pd.read_csv(paths[0]).head(3))
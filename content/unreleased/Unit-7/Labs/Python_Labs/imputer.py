@@ -0,0 +1,205 @@
+"""
+Module: imputer
+
+Fill missing values without copying the whole table for every strategy.
+
+An Imputer is configured with one strategy per column ("mean", "median",
+"mode", "ffill", "bfill" or a constant such as "Unknown") and optionally a
+grouping column, so that e.g. a missing Grade is filled with the mean Grade
+of the same Subject. Statistics are fitted once, in a single groupby pass
+(or chunk by chunk), and can then be reused to fill any number of later
+chunks. Filling either works in place or returns a shallow copy where only
+the filled columns are new.
+"""
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import TDigest
+
+_STATS = ("mean", "median", "mode")
+
+
+class Imputer:
+    """
+    Fill missing values using statistics fitted earlier.
+
+    Args:
+        strategies (dict): Column -> "mean", "median", "mode", "ffill",
+            "bfill", or a constant fill value.
+        by (str, optional): Column whose groups get their own statistics.
+            Rows of a group with no fitted statistic use the overall one.
+
+    Examples:
+        >>> df = pd.DataFrame({"Subject": ["Math", "Math", "English", "English"],
+        ...                    "Grade": [80, None, 60, None]})
+        >>> Imputer({"Grade": "mean"}, by="Subject").fit(df).transform(df)["Grade"].tolist()
+        [80.0, 80.0, 60.0, 60.0]
+    """
+
+    def __init__(self, strategies, by=None):
+        self.strategies = dict(strategies)
+        self.by = by
+        self.values_ = {}  # column -> {group: value}, with group None for overall
+        self._sums = {}
+        self._digests = {}
+        self._counts = {}
+        self._carry = {}  # last seen value per (column, group) for ffill across chunks
+        self._fitted = False
+
+    def _stat_columns(self, kind=None):
+        return [c for c, s in self.strategies.items()
+                if isinstance(s, str) and s in _STATS and (kind is None or s == kind)]
+
+    def fit(self, data):
+        """
+        Fit the statistics on a DataFrame or an iterator of chunks.
+
+        Args:
+            data (pandas.DataFrame or iterable of DataFrames): Training data.
+
+        Returns:
+            Imputer: self.
+        """
+        self._sums, self._digests, self._counts, self._carry = {}, {}, {}, {}
+        self.values_ = {}
+        self._fitted = False
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def partial_fit(self, chunk):
+        """
+        Update the statistics with one more chunk.
+
+        Means are kept as running sums and counts, medians as t-digest
+        sketches and modes as value counts, so chunks can be added in any
+        number without keeping them in memory.
+        """
+        # Group None holds the overall statistics. It is always fitted on
+        # every row, including rows whose `by` key is missing.
+        keys = chunk[self.by] if self.by else None
+        mean_cols = self._stat_columns("mean")
+        if mean_cols:
+            # One groupby pass gives the sums and counts of every mean column.
+            rows = [(None, chunk[mean_cols].agg(["sum", "count"]).unstack())]
+            if keys is not None:
+                rows += list(chunk.groupby(keys, observed=True)[mean_cols].agg(["sum", "count"]).iterrows())
+            for group, row in rows:
+                for col in mean_cols:
+                    sums = self._sums.setdefault(col, {})
+                    s, n = sums.get(group, (0.0, 0))
+                    sums[group] = (s + row[(col, "sum")], n + int(row[(col, "count")]))
+        for col in self._stat_columns("median"):
+            digests = self._digests.setdefault(col, {})
+            groups = [(None, chunk[col])]
+            if keys is not None:
+                groups += list(chunk.groupby(keys, observed=True)[col])
+            for group, values in groups:
+                digests.setdefault(group, TDigest()).update(values.to_numpy(dtype=float))
+        for col in self._stat_columns("mode"):
+            counts = self._counts.setdefault(col, {})
+            pairs = [((None, v), n) for v, n in chunk[col].value_counts().items()]
+            if keys is not None:
+                pairs += list(chunk.groupby(keys, observed=True)[col].value_counts().items())
+            for (group, value), n in pairs:
+                counter = counts.setdefault(group, {})
+                counter[value] = counter.get(value, 0) + n
+        self._finalize()
+        self._fitted = True
+        return self
+
+    def _finalize(self):
+        values = {}
+        for col, groups in self._sums.items():
+            values[col] = {g: s / n for g, (s, n) in groups.items() if n}
+        for col, groups in self._digests.items():
+            # quantile() flushes the digest's buffer, so check the result
+            # rather than d.count, which only counts flushed values.
+            medians = {g: float(d.quantile(0.5)) for g, d in groups.items()}
+            values[col] = {g: m for g, m in medians.items() if not np.isnan(m)}
+        for col, groups in self._counts.items():
+            values[col] = {g: max(c, key=c.get) for g, c in groups.items() if c}
+        self.values_ = values
+
+    def _fill_value(self, df, col):
+        stats = self.values_.get(col, {})
+        if not self.by:
+            return stats.get(None, np.nan)
+        fill = df[self.by].map(stats)
+        if isinstance(fill.dtype, pd.CategoricalDtype):
+            fill = fill.astype(object)
+        if None in stats:
+            fill = fill.fillna(stats[None])
+        return fill
+
+    def transform(self, df, inplace=False):
+        """
+        Fill the missing values of a DataFrame (or the next chunk).
+
+        Args:
+            df (pandas.DataFrame): Data to fill.
+            inplace (bool): Modify `df` itself instead of returning a copy.
+
+        Returns:
+            pandas.DataFrame: The filled data. Without `inplace`, this is a
+            shallow copy: only the filled columns are new arrays.
+        """
+        self._check_fitted()
+        out = df if inplace else df.copy(deep=False)
+        for col, strategy in self.strategies.items():
+            if not out[col].isna().any() and strategy not in ("ffill", "bfill"):
+                continue
+            if strategy in _STATS:
+                out[col] = out[col].fillna(self._fill_value(out, col))
+            elif strategy in ("ffill", "bfill"):
+                out[col] = self._directional_fill(out, col, strategy)
+            else:
+                out[col] = out[col].fillna(strategy)
+        return out
+
+    def _check_fitted(self):
+        # Constant and ffill/bfill strategies need no statistics.
+        if self._stat_columns() and not self._fitted:
+            raise ValueError("Imputer is not fitted yet; call fit() or partial_fit() first")
+
+    def _directional_fill(self, df, col, strategy):
+        series = df[col]
+        if self.by:
+            filled = getattr(series.groupby(df[self.by], observed=True), strategy)()
+        else:
+            filled = getattr(series, strategy)()
+        if strategy == "ffill":
+            # Gaps at the start of a chunk use the last value of earlier chunks.
+            carry = self._carry.setdefault(col, {})
+            keys = df[self.by] if self.by else None
+            if carry and filled.isna().any():
+                if keys is not None:
+                    filled = filled.fillna(keys.astype(object).map(carry))
+                else:
+                    filled = filled.fillna(carry[None])
+            valid = filled.dropna()
+            if keys is not None:
+                carry.update(valid.groupby(keys[valid.index], observed=True).last().to_dict())
+            elif len(valid):
+                carry[None] = valid.iloc[-1]
+        return filled
+
+    def fit_transform(self, df, inplace=False):
+        return self.fit(df).transform(df, inplace=inplace)
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("../grades.csv")
+
+    # Mean grade per subject and "Unknown" names, without copying the frame
+    imputer = Imputer({"Grade": "mean", "Name": "Unknown"}, by="Subject")
+    print(imputer.fit_transform(df))
+
+    # Fit once on chunks, then fill later chunks with the same statistics
+    imputer = Imputer({"Grade": "median"}, by="Subject").fit(pd.read_csv("../grades.csv", chunksize=4))
+    print(imputer.values_)
+    for chunk in pd.read_csv("../grades.csv", chunksize=4):
+        imputer.transform(chunk, inplace=True)
+        print(chunk)
@@ -0,0 +1,480 @@
+"""
+Module: instrument
+
+Time and memory metrics for the stages of a pipeline.
+
+Wrap each stage of a script (load, clean, analyze, plot, ...) in a
+`stage` block, or decorate the function that does it, and every stage
+records:
+
+- wall time and CPU time, and how many times it ran
+- rows processed and rows per second
+- peak memory allocated by Python objects during the stage (tracemalloc)
+- peak resident memory (RSS) of the process during the stage
+
+Running a stage again (e.g. once per chunk) adds to the same entry.
+Stages opened inside another stage are recorded as "outer/inner".
+
+An optional sampling profiler looks at the running code every few
+milliseconds and counts which functions each stage spends its time in.
+The results can be shown as a DataFrame or exported as JSON or as
+Prometheus text (for the node_exporter textfile collector).
+
+Metrics are off when the DSC481_METRICS environment variable is "0";
+stages then cost one function call.
+
+Examples:
+    >>> metrics = Metrics("demo", trace_memory=False)
+    >>> with metrics.stage("load") as s:
+    ...     s.rows = 3
+    >>> metrics.stats["load"].calls, metrics.stats["load"].rows
+    (1, 3)
+"""
+
+import ctypes
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+try:
+    _libc = ctypes.CDLL("libc.so.6")
+    _libc.malloc_trim
+except (OSError, AttributeError):  # not glibc
+    _libc = None
+
+ENABLED = os.environ.get("DSC481_METRICS", "1") != "0"
+
+
+def _memory():
+    """(current RSS, peak RSS) of this process in bytes; None where unknown."""
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            fields = dict(line.split(":", 1) for line in f if ":" in line)
+        return int(fields["VmRSS"].split()[0]) * 1024, int(fields["VmHWM"].split()[0]) * 1024
+    except (OSError, KeyError, ValueError):
+        pass
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return None, peak if sys.platform == "darwin" else peak * 1024
+    return None, None
+
+
+def _reset_peak_rss():
+    """Restart the process's peak RSS from its current RSS (Linux only)."""
+    if _libc is not None:
+        # Hand memory freed by earlier stages back to the OS first, or the
+        # next stage would reuse it without the resident set growing.
+        _libc.malloc_trim(0)
+    try:
+        with open("/proc/self/clear_refs", "w", encoding="ascii") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class StageStats:
+    """Totals for one stage name."""
+
+    __slots__ = ("name", "calls", "seconds", "cpu_seconds", "rows", "peak_traced", "peak_rss")
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.rows = None
+        self.peak_traced = None
+        self.peak_rss = None
+
+    @property
+    def rows_per_second(self):
+        if self.rows is None or self.seconds <= 0:
+            return None
+        return self.rows / self.seconds
+
+    def as_dict(self):
+        return {"stage": self.name, "calls": self.calls, "seconds": self.seconds,
+                "cpu_seconds": self.cpu_seconds, "rows": self.rows,
+                "rows_per_second": self.rows_per_second,
+                "peak_traced_bytes": self.peak_traced, "peak_rss_bytes": self.peak_rss}
+
+
+class _Run:
+    """One open stage; `rows` can be set or added to inside the block."""
+
+    __slots__ = ("name", "rows", "start", "cpu_start", "traced_start", "peak_traced", "peak_rss")
+
+    def __init__(self, name, rows):
+        self.name = name
+        self.rows = rows
+
+    def add_rows(self, n):
+        self.rows = (self.rows or 0) + n
+
+
+def _count_rows(result):
+    """Rows in a stage's result: len() of a table, array or list, else None."""
+    if isinstance(result, (str, bytes)) or not hasattr(result, "__len__"):
+        return None
+    return len(result)
+
+
+class _Sampler(threading.Thread):
+    """Samples the call stack of one thread and counts it under the open stage."""
+
+    def __init__(self, metrics, thread_id, interval):
+        super().__init__(name="instrument-sampler", daemon=True)
+        self.metrics = metrics
+        self.thread_id = thread_id
+        self.interval = interval
+        self.halt = threading.Event()
+
+    def run(self):
+        last = time.perf_counter()
+        while not self.halt.wait(self.interval):
+            # A sample can come late while C code holds the GIL; let it stand
+            # for all the intervals that passed.
+            now = time.perf_counter()
+            weight, last = max(1, round((now - last) / self.interval)), now
+            open_stages = self.metrics._open
+            frame = sys._current_frames().get(self.thread_id)
+            if not open_stages or frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.metrics.samples[open_stages[-1].name][tuple(reversed(stack))] += weight
+
+
+class Metrics:
+    """
+    Collects stage metrics for one pipeline run.
+
+    Args:
+        name (str): Pipeline name, used as a label in the exports.
+        trace_memory (bool): Track Python allocations with tracemalloc.
+            This slows allocation-heavy code down noticeably.
+        profile (bool): Run the sampling profiler while stages are open.
+        interval (float): Seconds between profiler samples.
+        enabled (bool): Record anything at all (default: DSC481_METRICS).
+
+    Use one Metrics object per thread; stages are recorded for the thread
+    that opens them.
+    """
+
+    def __init__(self, name="pipeline", trace_memory=True, profile=False, interval=0.005, enabled=None):
+        self.name = name
+        self.trace_memory = trace_memory
+        self.profile = profile
+        self.interval = interval
+        self.enabled = ENABLED if enabled is None else enabled
+        self.stats = {}
+        self.samples = {}
+        self._open = []
+        self._started_tracing = False
+        self._sampler = None
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        """
+        Record the code in a `with` block as one run of stage `name`.
+
+        Args:
+            name (str): Stage name, e.g. "load" or "clean".
+            rows (int, optional): Rows the stage processes; can also be set
+                later through the yielded object (`s.rows = len(df)` or
+                `s.add_rows(len(chunk))`).
+
+        Yields:
+            object: The open stage, with a `rows` attribute.
+        """
+        run = _Run(name, rows)
+        if not self.enabled:
+            yield run
+            return
+        self._begin(run)
+        try:
+            yield run
+        finally:
+            self._end(run)
+
+    def timed(self, name=None, rows=_count_rows):
+        """
+        Decorator that records every call of a function as a stage.
+
+        Args:
+            name (str, optional): Stage name (default: the function name).
+            rows (callable, optional): Maps the function's result to the
+                rows processed (default: len() of the result).
+        """
+        def decorate(func):
+            stage_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.stage(stage_name) as run:
+                    result = func(*args, **kwargs)
+                    if rows is not None:
+                        run.rows = rows(result)
+                    return result
+            return wrapper
+        return decorate
+
+    def _begin(self, run):
+        parent = self._open[-1] if self._open else None
+        if parent is not None:
+            run.name = f"{parent.name}/{run.name}"
+        else:
+            if self.trace_memory and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._started_tracing = True
+            if self.profile:
+                self._sampler = _Sampler(self, threading.get_ident(), self.interval)
+                self._sampler.start()
+        self.samples.setdefault(run.name, Counter())
+
+        # Peaks are reset for the new stage, so fold the parent's peak so far
+        # into the parent first.
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            if parent is not None and parent.peak_traced is not None:
+                parent.peak_traced = max(parent.peak_traced, peak)
+            tracemalloc.reset_peak()
+            run.traced_start = run.peak_traced = current
+        else:
+            run.traced_start = run.peak_traced = None
+        _, peak_rss = _memory()
+        if parent is not None and peak_rss is not None:
+            parent.peak_rss = max(parent.peak_rss or 0, peak_rss)
+        _reset_peak_rss()
+        run.peak_rss = None
+        self._open.append(run)
+        run.cpu_start = time.process_time()
+        run.start = time.perf_counter()
+
+    def _end(self, run):
+        seconds = time.perf_counter() - run.start
+        cpu_seconds = time.process_time() - run.cpu_start
+        self._open.pop()
+        if run.traced_start is not None and tracemalloc.is_tracing():
+            run.peak_traced = max(run.peak_traced, tracemalloc.get_traced_memory()[1])
+        _, peak_rss = _memory()
+        if peak_rss is not None:
+            run.peak_rss = max(run.peak_rss or 0, peak_rss)
+
+        stats = self.stats.get(run.name)
+        if stats is None:
+            stats = self.stats[run.name] = StageStats(run.name)
+        stats.calls += 1
+        stats.seconds += seconds
+        stats.cpu_seconds += cpu_seconds
+        if run.rows is not None:
+            stats.rows = (stats.rows or 0) + run.rows
+        if run.traced_start is not None:
+            extra = run.peak_traced - run.traced_start
+            stats.peak_traced = max(stats.peak_traced or 0, extra)
+        if run.peak_rss is not None:
+            stats.peak_rss = max(stats.peak_rss or 0, run.peak_rss)
+
+        parent = self._open[-1] if self._open else None
+        if parent is not None:
+            # The child's peaks happened inside the parent too.
+            if run.traced_start is not None and parent.peak_traced is not None:
+                parent.peak_traced = max(parent.peak_traced, run.peak_traced)
+            if run.peak_rss is not None:
+                parent.peak_rss = max(parent.peak_rss or 0, run.peak_rss)
+        else:
+            if self._started_tracing:
+                tracemalloc.stop()
+                self._started_tracing = False
+            if self._sampler is not None:
+                self._sampler.halt.set()
+                self._sampler.join()
+                self._sampler = None
+
+    def report(self):
+        """
+        One row per stage, in the order the stages first finished.
+
+        Returns:
+            pandas.DataFrame: calls, seconds, cpu_seconds, rows, rows_per_s,
+            peak_traced_mb, peak_rss_mb and share (fraction of the time of
+            all top-level stages).
+        """
+        columns = ["calls", "seconds", "cpu_seconds", "rows", "rows_per_s",
+                   "peak_traced_mb", "peak_rss_mb", "share"]
+        total = sum(s.seconds for s in self.stats.values() if "/" not in s.name)
+        rows = []
+        for s in self.stats.values():
+            rows.append([s.calls, s.seconds, s.cpu_seconds, s.rows, s.rows_per_second,
+                         None if s.peak_traced is None else s.peak_traced / 2 ** 20,
+                         None if s.peak_rss is None else s.peak_rss / 2 ** 20,
+                         s.seconds / total if total else None])
+        return pd.DataFrame(rows, columns=columns, index=pd.Index(list(self.stats), name="stage"))
+
+    def hotspots(self, stage=None, top=10):
+        """
+        Functions the profiler saw most often.
+
+        Args:
+            stage (str, optional): Only this stage (default: all stages).
+            top (int): Number of functions to return.
+
+        Returns:
+            pandas.DataFrame: For each function, `self` samples (it was the
+            running function) and `total` samples (it was anywhere on the
+            stack), plus `self_share` of all samples counted.
+        """
+        own, total = Counter(), Counter()
+        for name, stacks in self.samples.items():
+            if stage is not None and name != stage:
+                continue
+            for stack, n in stacks.items():
+                if stack:
+                    own[stack[-1]] += n
+                for func in set(stack):
+                    total[func] += n
+        counted = sum(own.values())
+        funcs = [f for f, _ in own.most_common(top)]
+        return pd.DataFrame({"self": [own[f] for f in funcs], "total": [total[f] for f in funcs],
+                             "self_share": [own[f] / counted for f in funcs]},
+                            index=pd.Index(funcs, name="function"))
+
+    def to_dict(self, top=20):
+        """Stage metrics and the top `top` profiled functions per stage."""
+        profile = {}
+        for name, stacks in self.samples.items():
+            if stacks:
+                hot = self.hotspots(name, top)
+                profile[name] = [{"function": f, "self": int(r["self"]), "total": int(r["total"])}
+                                 for f, r in hot.iterrows()]
+        return {"pipeline": self.name, "time": time.time(),
+                "stages": [s.as_dict() for s in self.stats.values()], "profile": profile}
+
+    def to_json(self, path=None, top=20):
+        """
+        Metrics as JSON; written to `path` if given.
+
+        Returns:
+            str: The JSON text.
+        """
+        text = json.dumps(self.to_dict(top), indent=2)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
+
+    def to_prometheus(self, path=None, top=20):
+        """
+        Metrics in the Prometheus text exposition format.
+
+        Every value is a gauge labelled with the pipeline and stage names;
+        profiled functions become `pipeline_profile_samples`. If `path` is
+        given the text is written there atomically, as the node_exporter
+        textfile collector expects.
+
+        Returns:
+            str: The exposition text.
+        """
+        gauges = [
+            ("pipeline_stage_calls", "Times the stage ran.", "calls"),
+            ("pipeline_stage_seconds", "Wall time spent in the stage.", "seconds"),
+            ("pipeline_stage_cpu_seconds", "CPU time spent in the stage.", "cpu_seconds"),
+            ("pipeline_stage_rows", "Rows processed by the stage.", "rows"),
+            ("pipeline_stage_rows_per_second", "Stage throughput in rows per second.", "rows_per_second"),
+            ("pipeline_stage_peak_traced_bytes", "Peak Python allocations during the stage.", "peak_traced_bytes"),
+            ("pipeline_stage_peak_rss_bytes", "Peak resident memory during the stage.", "peak_rss_bytes"),
+        ]
+        stages = [s.as_dict() for s in self.stats.values()]
+        lines = []
+        for metric, help_text, key in gauges:
+            values = [(s["stage"], s[key]) for s in stages if s[key] is not None]
+            if not values:
+                continue
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} gauge"]
+            for stage, value in values:
+                lines.append(f"{metric}{_labels(pipeline=self.name, stage=stage)} {value:.9g}")
+        profile = self.to_dict(top)["profile"]
+        if profile:
+            metric = "pipeline_profile_samples"
+            lines += [f"# HELP {metric} Profiler samples with the function running.", f"# TYPE {metric} gauge"]
+            for stage, funcs in profile.items():
+                for f in funcs:
+                    labels = _labels(pipeline=self.name, stage=stage, function=f["function"])
+                    lines.append(f"{metric}{labels} {f['self']}")
+        text = "\n".join(lines) + "\n"
+        if path:
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(text)
+            os.replace(tmp, path)
+        return text
+
+    def write_collapsed(self, path):
+        """
+        Write the profiler samples as collapsed stacks ("stage;f;g;h count"
+        per line), the input format of flamegraph.pl and speedscope.
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for stage, stacks in self.samples.items():
+                for stack, n in stacks.items():
+                    f.write(";".join((stage,) + stack) + f" {n}\n")
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels.items()) + "}"
+
+
+if __name__ == "__main__":
+    import io
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    metrics = Metrics("grades", profile=True)
+
+    @metrics.timed("load")
+    def load(copies=50_000):
+        grades = pd.read_csv("../grades.csv")
+        return grades.loc[grades.index.repeat(copies)].reset_index(drop=True)
+
+    df = load()
+    with metrics.stage("clean", rows=len(df)):
+        with metrics.stage("fill", rows=len(df)):
+            df["Grade"] = df["Grade"].fillna(df["Grade"].mean())
+        with metrics.stage("types", rows=len(df)):
+            df["Date"] = pd.to_datetime(df["Date"])
+            df["Subject"] = df["Subject"].astype("category")
+        with metrics.stage("dedupe", rows=len(df)):
+            unique = df.drop_duplicates()
+    with metrics.stage("analyze", rows=len(df)):
+        summary = df.groupby("Subject", observed=True)["Grade"].describe()
+    with metrics.stage("plot", rows=len(df)):
+        fig, ax = plt.subplots()
+        ax.hist(df["Grade"], bins=20)
+        fig.savefig(io.BytesIO(), format="png")
+        plt.close(fig)
+
+    print(summary)
+    print(metrics.report().round(3))
+    print(metrics.hotspots(top=5))
+    print(metrics.to_prometheus(top=3))
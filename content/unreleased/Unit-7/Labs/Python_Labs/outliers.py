@@ -0,0 +1,249 @@
+"""
+Module: outliers
+
+Outlier detection for grade feeds that arrive in batches.
+
+The statistics behind the fences are kept in mergeable sketches instead of
+being recomputed from the sorted column: quartiles (IQR rule) and the
+median / MAD come from a t-digest (see quantile_sketch.TDigest), and the
+z-score rule uses running count, mean and sum of squares. One pass over the
+data is enough, Q1 and Q3 come from the same sketch, and each new batch only
+updates the sketches before it is checked.
+
+Fences can be computed per group (for example per Subject); values of a
+group that was never seen are checked against the overall fences.
+"""
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import TDigest
+
+METHODS = ("iqr", "zscore", "mad")
+DEFAULT_K = {"iqr": 1.5, "zscore": 3.0, "mad": 3.5}
+
+
+class _Moments:
+    """Running count, mean and sum of squared deviations (Chan et al.)."""
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size:
+            other = _Moments()
+            other.count = values.size
+            other.mean = values.mean()
+            other.m2 = ((values - other.mean) ** 2).sum()
+            self.merge(other)
+
+    def merge(self, other):
+        n = self.count + other.count
+        if other.count:
+            delta = other.mean - self.mean
+            self.mean += delta * other.count / n
+            self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+            self.count = n
+        return self
+
+    def std(self):
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+
+def _mad(digest):
+    """Median absolute deviation read from a digest, without a second pass."""
+    if not digest.count:
+        return np.nan, np.nan
+    median = digest.quantile(0.5)
+    # |x - median| <= d holds for half of the data at d = MAD; the fraction
+    # grows with d, so d is found by bisection on the digest's CDF.
+    lo, hi = 0.0, max(digest.max - median, median - digest.min)
+    for _ in range(60):
+        mid = (lo + hi) / 2
+        if digest.cdf(median + mid) - digest.cdf(median - mid) < 0.5:
+            lo = mid
+        else:
+            hi = mid
+    return median, hi
+
+
+class OutlierDetector:
+    """
+    Flag outliers in a numeric column using one-pass, mergeable statistics.
+
+    Args:
+        column (str): Column to check (e.g. "Grade").
+        method (str): "iqr" (Tukey fences Q1 - k*IQR, Q3 + k*IQR), "zscore"
+            (|x - mean| > k * std) or "mad" (modified z-score
+            0.6745 * |x - median| / MAD > k).
+        k (float, optional): Fence multiplier. Defaults to 1.5, 3.0 and 3.5
+            for the three methods.
+        by (str, optional): Column whose groups get their own fences.
+        error (float): Target rank error of the quantile estimates, e.g.
+            0.01 means a quartile is off by at most about 1% of the rows.
+            Smaller values use larger sketches.
+
+    Examples:
+        >>> df = pd.DataFrame({"Grade": [70, 72, 74, 75, 76, 78, 5]})
+        >>> OutlierDetector("Grade").fit(df).outliers(df)["Grade"].tolist()
+        [5]
+    """
+
+    def __init__(self, column, method="iqr", k=None, by=None, error=0.01):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+        if not 0 < error < 1:
+            raise ValueError("error must be between 0 and 1")
+        self.column = column
+        self.method = method
+        self.k = DEFAULT_K[method] if k is None else k
+        self.by = by
+        self.error = error
+        # Near the quartiles a k1 t-digest centroid spans about
+        # 2.7 / compression of the rows, and interpolation halves that.
+        self.compression = max(20, int(np.ceil(1.4 / error)))
+        self._overall = self._new_stat()
+        self._groups = {}  # group -> TDigest or _Moments
+        self._fences = None
+
+    def _new_stat(self):
+        return _Moments() if self.method == "zscore" else TDigest(self.compression)
+
+    def fit(self, data):
+        """
+        Fit the fences on a DataFrame or an iterator of chunks.
+
+        Args:
+            data (pandas.DataFrame or iterable of DataFrames): Training data.
+
+        Returns:
+            OutlierDetector: self.
+        """
+        self._overall = self._new_stat()
+        self._groups = {}
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def partial_fit(self, chunk):
+        """
+        Add one more chunk to the statistics.
+
+        Args:
+            chunk (pandas.DataFrame): Rows with `column` (and `by`).
+
+        Returns:
+            OutlierDetector: self.
+        """
+        values = chunk[self.column]
+        self._overall.update(values.to_numpy(dtype=float))
+        if self.by:
+            for group, part in values.groupby(chunk[self.by], observed=True):
+                self._groups.setdefault(group, self._new_stat()).update(part.to_numpy(dtype=float))
+        self._fences = None
+        return self
+
+    def merge(self, other):
+        """
+        Fold in a detector fitted on another part of the data.
+
+        Both detectors must use the same column, method and grouping.
+
+        Returns:
+            OutlierDetector: self.
+        """
+        self._overall.merge(other._overall)
+        for group, stat in other._groups.items():
+            self._groups.setdefault(group, self._new_stat()).merge(stat)
+        self._fences = None
+        return self
+
+    def _fence(self, stat):
+        if self.method == "iqr":
+            q1, q3 = stat.quantile([0.25, 0.75])
+            iqr = q3 - q1
+            return q1 - self.k * iqr, q3 + self.k * iqr
+        if self.method == "zscore":
+            spread = self.k * stat.std()
+            return stat.mean - spread, stat.mean + spread
+        median, mad = _mad(stat)
+        spread = self.k * mad / 0.6745
+        return median - spread, median + spread
+
+    def fences(self):
+        """
+        Lower and upper fence per group.
+
+        Returns:
+            pandas.DataFrame: Columns "lower" and "upper", indexed by group,
+            with the overall fences in a last row labelled "All".
+        """
+        groups, overall = self._fence_table()
+        return pd.concat([groups, pd.DataFrame([overall], index=["All"], columns=groups.columns)])
+
+    def _fence_table(self):
+        if self._fences is None:
+            rows = {group: self._fence(stat) for group, stat in self._groups.items()}
+            groups = pd.DataFrame.from_dict(rows, orient="index", columns=["lower", "upper"])
+            self._fences = groups, self._fence(self._overall)
+        return self._fences
+
+    def mask(self, chunk, update=False):
+        """
+        Boolean mask of the outlier rows of a chunk.
+
+        Args:
+            chunk (pandas.DataFrame): Rows to check.
+            update (bool): Add the chunk to the statistics first, so a
+                continuous feed is always checked against all data so far.
+
+        Returns:
+            pandas.Series: True where the value lies outside its fences.
+            Missing values are never outliers.
+        """
+        if update:
+            self.partial_fit(chunk)
+        groups, (lower, upper) = self._fence_table()
+        values = chunk[self.column]
+        if self.by:
+            keys = chunk[self.by].astype(object)
+            lower = keys.map(groups["lower"]).fillna(lower)
+            upper = keys.map(groups["upper"]).fillna(upper)
+        return (values < lower) | (values > upper)
+
+    def outliers(self, chunk, update=False):
+        """Rows of `chunk` that are outliers (see mask)."""
+        return chunk[self.mask(chunk, update)]
+
+    def remove(self, chunk, update=False):
+        """Rows of `chunk` that are not outliers (see mask)."""
+        return chunk[~self.mask(chunk, update)]
+
+
+def find_outliers(df, column, method="iqr", k=None, by=None, error=0.01):
+    """
+    One-call version: fit an OutlierDetector on `df` and return its outliers.
+
+    Returns:
+        pandas.DataFrame: The outlier rows of `df`.
+    """
+    return OutlierDetector(column, method, k, by, error).fit(df).outliers(df)
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("../grades.csv")
+
+    # Q1 and Q3 from one sketch, fences per Subject
+    detector = OutlierDetector("Grade", by="Subject").fit(df)
+    print(detector.fences())
+    print(detector.outliers(df))
+
+    # A continuous feed: each batch updates the sketch, then gets checked
+    feed = OutlierDetector("Grade", method="mad")
+    for batch in pd.read_csv("../grades.csv", chunksize=4):
+        print(feed.outliers(batch, update=True))
@@ -5,7 +5,10 @@
 
 import pandas as pd
 
+from scalers import Scaler
+
 df = pd.read_csv("../grades.csv")
-df["Norm"] = (df["Grade"] - df["Grade"].min()) / (df["Grade"].max() - df["Grade"].min())
+# Fitted min/max, reusable for later batches; safe if all grades are equal
+df["Norm"] = Scaler("minmax", ["Grade"]).fit(df).scale(df["Grade"])
 high_norm = df[df["Norm"] > 0.8]
 print(high_norm)
\ No newline at end of file
@@ -0,0 +1,117 @@
+# Streaming version of q12_full_cleaning.py
+# - Same cleaning steps, but the grades file is read in chunks so that
+#   files much larger than memory can be cleaned.
+# - Pass 1 collects the statistics: mean grade, Q1/Q3 (t-digest sketch),
+#   and the min/max of the grades that survive the outlier filter.
+# - Pass 2 fills, deduplicates, filters, normalizes and converts each chunk,
+#   then appends it to the output file.
+
+import numpy as np
+import pandas as pd
+
+from dedupe_engine import SeenHashes, hash_rows
+from quantile_sketch import TDigest
+
+
+def _new_rows(chunk, seen):
+    """Mask of rows not seen before (in this chunk or earlier ones)."""
+    return seen.first_seen(hash_rows(chunk))
+
+
+def grade_stats(path, chunksize=100_000, compression=200):
+    """
+    First pass: compute the statistics the cleaning steps need.
+
+    Duplicate rows are skipped before the quartiles are estimated, just
+    like the in-memory version. Missing grades enter the sketch as the mean.
+
+    Args:
+        path (str): CSV file with StudentID, Name, Subject, Grade, Date.
+        chunksize (int): Number of rows read at a time.
+        compression (float): Accuracy of the quartile sketch (see TDigest).
+
+    Returns:
+        dict: mean, q1, q3, lower, upper, min and max of the grades.
+    """
+    digest = TDigest(compression)
+    total = 0.0
+    count = 0
+    missing = 0
+    seen = SeenHashes()
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        grades = chunk["Grade"]
+        total += grades.sum()
+        count += int(grades.count())
+        unique = grades[_new_rows(chunk, seen)]
+        missing += int(unique.isna().sum())
+        digest.update(unique.to_numpy())
+
+    mean = total / count if count else np.nan
+    if missing:
+        digest.update([mean], weight=missing)
+    q1, q3 = digest.quantile([0.25, 0.75])
+    iqr = q3 - q1
+    lower = q1 - 1.5 * iqr
+    upper = q3 + 1.5 * iqr
+
+    # The normalization range is taken after the outlier filter, so only the
+    # Grade column is read again to find the min and max inside the fences.
+    low, high = np.inf, -np.inf
+    for chunk in pd.read_csv(path, usecols=["Grade"], chunksize=chunksize):
+        grades = chunk["Grade"].fillna(mean)
+        kept = grades[(grades >= lower) & (grades <= upper)]
+        if len(kept):
+            low = min(low, kept.min())
+            high = max(high, kept.max())
+
+    return {"mean": mean, "q1": q1, "q3": q3, "lower": lower, "upper": upper,
+            "min": low, "max": high}
+
+
+def clean_grades_stream(src, dst, chunksize=100_000, compression=200):
+    """
+    Clean a grades CSV chunk by chunk and write the result to `dst`.
+
+    Memory depends on `chunksize`, plus 8 bytes per unique row for the
+    sorted row hashes used to find duplicates (see dedupe_engine.SeenHashes).
+
+    Args:
+        src (str): Input CSV file.
+        dst (str): Output CSV file (overwritten).
+        chunksize (int): Number of rows read at a time.
+        compression (float): Accuracy of the quartile sketch (see TDigest).
+
+    Returns:
+        dict: The statistics used for cleaning (see grade_stats).
+    """
+    stats = grade_stats(src, chunksize, compression)
+    span = stats["max"] - stats["min"]
+    seen = SeenHashes()
+    header = True
+    for chunk in pd.read_csv(src, chunksize=chunksize):
+        # Fill missing grades with mean
+        chunk["Grade"] = chunk["Grade"].fillna(stats["mean"])
+
+        # Remove duplicates (across all chunks)
+        chunk = chunk[_new_rows(chunk, seen)]
+
+        # Remove outliers
+        chunk = chunk[(chunk["Grade"] >= stats["lower"]) & (chunk["Grade"] <= stats["upper"])].copy()
+
+        # Normalize
+        chunk["Grade_norm"] = (chunk["Grade"] - stats["min"]) / span
+
+        # Convert types
+        chunk["Grade"] = chunk["Grade"].astype(float)
+        chunk["Date"] = pd.to_datetime(chunk["Date"])
+
+        # Save (append after the first chunk)
+        chunk.to_csv(dst, mode="w" if header else "a", header=header, index=False)
+        header = False
+    return stats
+
+
+if __name__ == "__main__":
+    stats = clean_grades_stream("../grades.csv", "../cleaned_grades.csv", chunksize=2)
+    print("Statistics used:", stats)
+    print("Cleaned data saved.")
@@ -4,8 +4,9 @@
 # - Print the shape of the DataFrame using df.shape.
 # - Show column names with df.columns.
 
-import pandas as pd
+from fetcher import read_csv
 
-df = pd.read_csv("https://raw.githubusercontent.com/uiuc-cse/data-fa14/gh-pages/data/iris.csv")
+# Downloaded once, then read from the local cache (see fetcher.py)
+df = read_csv("https://raw.githubusercontent.com/uiuc-cse/data-fa14/gh-pages/data/iris.csv")
 print(df.shape)
 print(df.columns)
\ No newline at end of file
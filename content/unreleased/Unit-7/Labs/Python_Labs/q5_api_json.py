@@ -4,9 +4,9 @@
 # - Show the first 3 rows using df.head(3).
 # - Print all usernames in the DataFrame.
 
-import pandas as pd
+from fetcher import read_json
 
 url = "https://jsonplaceholder.typicode.com/users"
-df = pd.read_json(url)
+df = read_json(url)  # cached copy on repeat runs (see fetcher.py)
 print(df.head(3))
 print(df['username'])
\ No newline at end of file
@@ -7,8 +7,8 @@
 import pandas as pd
 
 df = pd.read_csv("../grades.csv")
-Q1 = df["Grade"].quantile(0.25)
-Q3 = df["Grade"].quantile(0.75)
+# Both quartiles from one sort (see outliers.py for batches / per group)
+Q1, Q3 = df["Grade"].quantile([0.25, 0.75])
 IQR = Q3 - Q1
 lower = Q1 - 1.5 * IQR
 upper = Q3 + 1.5 * IQR
@@ -0,0 +1,141 @@
+"""
+Module: quantile_sketch
+
+A small merging t-digest for estimating quantiles of data that does not fit
+in memory. Values are added chunk by chunk, and digests built on separate
+chunks (or machines) can be merged before asking for a quantile.
+"""
+
+import numpy as np
+
+
+class TDigest:
+    """
+    Approximate quantile sketch (merging t-digest).
+
+    Args:
+        compression (float): Controls accuracy and size. The digest keeps at
+            most about `compression` centroids; larger values are more
+            accurate, especially near the median.
+        buffer_size (int): Number of raw values collected before they are
+            compressed into centroids.
+
+    Examples:
+        >>> d = TDigest()
+        >>> d.update(np.arange(1, 101))
+        >>> round(d.quantile(0.5))
+        50
+    """
+
+    def __init__(self, compression=100, buffer_size=10000):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def update(self, values, weight=1.0):
+        """
+        Add values to the digest. NaN values are ignored.
+
+        Args:
+            values (array-like): The values to add.
+            weight (float): Weight given to each value (for example the
+                number of rows that share it).
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0 or weight <= 0:
+            return
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        self._buffer.append((values, np.full(values.size, float(weight))))
+        self._buffered += values.size
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other):
+        """
+        Fold another digest into this one.
+
+        Args:
+            other (TDigest): A digest built over a different part of the data.
+
+        Returns:
+            TDigest: self, so calls can be chained.
+        """
+        other._compress()
+        if other.count:
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._buffer.append((other.means, other.weights))
+            self._buffered += other.means.size
+            self._compress()
+        return self
+
+    def quantile(self, q):
+        """
+        Estimate one or more quantiles.
+
+        Args:
+            q (float or array-like): Quantile(s) between 0 and 1.
+
+        Returns:
+            float or numpy.ndarray: The estimated value(s), NaN if empty.
+        """
+        self._compress()
+        q = np.asarray(q, dtype=float)
+        if self.count == 0:
+            return np.full(q.shape, np.nan)[()]
+        # Each centroid sits at the middle of the weight it represents.
+        centers = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate(([0.0], centers, [self.count]))
+        y = np.concatenate(([self.min], self.means, [self.max]))
+        return np.interp(q * self.count, x, y)[()]
+
+    def cdf(self, values):
+        """
+        Estimate the fraction of the data at or below one or more values.
+
+        Args:
+            values (float or array-like): The value(s) to look up.
+
+        Returns:
+            float or numpy.ndarray: Fraction(s) between 0 and 1, NaN if empty.
+        """
+        self._compress()
+        values = np.asarray(values, dtype=float)
+        if self.count == 0:
+            return np.full(values.shape, np.nan)[()]
+        centers = np.cumsum(self.weights) - self.weights / 2
+        x = np.concatenate(([0.0], centers, [self.count]))
+        y = np.concatenate(([self.min], self.means, [self.max]))
+        return (np.interp(values, y, x) / self.count)[()]
+
+    def _compress(self):
+        if not self._buffer:
+            return
+        means = np.concatenate([self.means] + [m for m, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [w for _, w in self._buffer])
+        self._buffer = []
+        self._buffered = 0
+
+        order = np.argsort(means, kind="mergesort")
+        means = means[order]
+        weights = weights[order]
+        total = weights.sum()
+        # Scale function k1: centroids are allowed to span one unit of k, so
+        # they stay small near the tails and grow towards the median.
+        q_left = (np.cumsum(weights) - weights) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q_left - 1)
+        groups = np.floor(k - k[0]).astype(np.int64)
+        groups = np.unique(groups, return_inverse=True)[1]
+
+        merged_weights = np.bincount(groups, weights=weights)
+        self.means = np.bincount(groups, weights=means * weights) / merged_weights
+        self.weights = merged_weights
+        self.count = total
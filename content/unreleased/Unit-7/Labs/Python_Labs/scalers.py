@@ -0,0 +1,248 @@
+"""
+Module: scalers
+
+Fit a scaling once, then apply it to any number of later batches.
+
+Three methods are supported:
+
+- "minmax": (x - min) / (max - min), values in [0, 1]
+- "zscore": (x - mean) / std
+- "robust": (x - median) / IQR, not pulled around by outliers
+
+The statistics can be fitted on a whole DataFrame or chunk by chunk (the
+robust scaler uses t-digest quantiles, see quantile_sketch.py). Every
+method is stored as a float64 center and spread per column and applied as
+(x - center) / spread with NumPy ufuncs writing into the same array. The
+center is subtracted in float64, so large values (e.g. IDs around
+1,000,000) keep their precision; pass dtype=np.float32 to get the result
+in half the memory. A column with zero range (or zero spread) is given a
+spread of 1, so it maps to a constant instead of dividing by zero.
+
+Examples:
+    >>> df = pd.DataFrame({"Grade": [50.0, 75.0, 100.0]})
+    >>> Scaler("minmax").fit(df).transform(df)["Grade"].tolist()
+    [0.0, 0.5, 1.0]
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import TDigest
+
+METHODS = ("minmax", "zscore", "robust")
+
+
+class Scaler:
+    """
+    Column scaler with reusable, saveable parameters.
+
+    Args:
+        method (str): "minmax", "zscore" or "robust".
+        columns (list of str, optional): Columns to scale (default: all
+            numeric columns of the first chunk fitted).
+        compression (float): Accuracy of the robust scaler's quantile sketch.
+    """
+
+    def __init__(self, method="minmax", columns=None, compression=200):
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+        self.method = method
+        self.columns = None if columns is None else list(columns)
+        self.compression = compression
+        self.center_ = None
+        self.spread_ = None
+        self._reset()
+
+    def _reset(self):
+        self._count = self._mean = self._m2 = None
+        self._min = self._max = None
+        self._digests = None
+
+    def fit(self, data):
+        """
+        Fit on a DataFrame or an iterator of chunks.
+
+        Returns:
+            Scaler: self.
+        """
+        self._reset()
+        chunks = [data] if isinstance(data, pd.DataFrame) else data
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self
+
+    def partial_fit(self, chunk):
+        """
+        Add one more chunk to the statistics and update the parameters.
+
+        Returns:
+            Scaler: self.
+        """
+        if self.columns is None:
+            self.columns = chunk.select_dtypes(include="number").columns.tolist()
+        x = chunk[self.columns].to_numpy(dtype=np.float64)
+        k = len(self.columns)
+        if self.method == "minmax":
+            if self._min is None:
+                self._min, self._max = np.full(k, np.inf), np.full(k, -np.inf)
+            if len(x):
+                np.fmin(self._min, np.nanmin(x, axis=0, initial=np.inf), out=self._min)
+                np.fmax(self._max, np.nanmax(x, axis=0, initial=-np.inf), out=self._max)
+        elif self.method == "zscore":
+            if self._count is None:
+                self._count, self._mean, self._m2 = np.zeros(k), np.zeros(k), np.zeros(k)
+            n = np.sum(~np.isnan(x), axis=0)
+            if n.any():
+                # Combine the chunk's mean and squared deviations (Chan et al.).
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    mean = np.where(n > 0, np.nansum(x, axis=0) / n, 0.0)
+                    m2 = np.nansum((x - mean) ** 2, axis=0)
+                    total = self._count + n
+                    delta = mean - self._mean
+                    self._mean = np.where(total > 0, self._mean + delta * n / total, 0.0)
+                    self._m2 += m2 + np.where(total > 0, delta ** 2 * self._count * n / total, 0.0)
+                self._count = total
+        else:
+            if self._digests is None:
+                self._digests = [TDigest(self.compression) for _ in range(k)]
+            for digest, values in zip(self._digests, x.T):
+                digest.update(values)
+        self._set_params()
+        return self
+
+    def _set_params(self):
+        if self.method == "minmax":
+            center, spread = self._min, self._max - self._min
+        elif self.method == "zscore":
+            center = self._mean
+            with np.errstate(invalid="ignore", divide="ignore"):
+                spread = np.sqrt(self._m2 / (self._count - 1))
+        else:
+            q = np.array([d.quantile([0.25, 0.5, 0.75]) for d in self._digests]).reshape(-1, 3)
+            center, spread = q[:, 1], q[:, 2] - q[:, 0]
+        # Zero or undefined spread: keep the column's shift, do not divide.
+        self.center_ = np.asarray(center, dtype=np.float64)
+        self.spread_ = np.where(np.isfinite(spread) & (spread > 0), spread, 1.0).astype(np.float64)
+
+    def transform(self, df, inplace=False, suffix="", dtype=np.float64):
+        """
+        Scale the fitted columns of a DataFrame.
+
+        The columns are taken out as one float64 block, scaled with two
+        in-place ufuncs (subtract, divide) and written back.
+
+        Args:
+            df (pandas.DataFrame): Data with the fitted columns.
+            inplace (bool): Write into `df` instead of a shallow copy.
+            suffix (str): Write the scaled values to "<column><suffix>"
+                (e.g. "_norm") instead of replacing the columns.
+            dtype: Type of the scaled columns (np.float32 halves their size).
+
+        Returns:
+            pandas.DataFrame: The scaled data.
+        """
+        self._check_fitted()
+        out = df if inplace else df.copy(deep=False)
+        block = self.transform_array(df[self.columns].to_numpy(dtype=np.float64, copy=True), inplace=True)
+        block = block.astype(dtype, copy=False)
+        for i, col in enumerate(self.columns):
+            out[col + suffix] = block[:, i]
+        return out
+
+    def transform_array(self, x, inplace=False):
+        """
+        Scale a 2-D array whose columns are in the order of `columns`.
+
+        Args:
+            x (numpy.ndarray): Shape (rows, len(columns)).
+            inplace (bool): Overwrite `x` (must then be a writable float
+                array; float64 keeps full precision).
+
+        Returns:
+            numpy.ndarray: The scaled values (float64 unless `x` was
+            scaled in place).
+        """
+        self._check_fitted()
+        x = x if inplace else np.array(x, dtype=np.float64)
+        np.subtract(x, self.center_, out=x, casting="same_kind")
+        np.divide(x, self.spread_, out=x, casting="same_kind")
+        return x
+
+    def scale(self, values, column=None, dtype=np.float64):
+        """
+        Scale one column given as a Series or 1-D array.
+
+        Args:
+            values (array-like): The values.
+            column (str, optional): Which fitted column's parameters to use
+                (default: the Series name, or the only fitted column).
+            dtype: Type of the result.
+
+        Returns:
+            numpy.ndarray: The scaled values.
+        """
+        self._check_fitted()
+        if column is None:
+            column = getattr(values, "name", None) if len(self.columns) > 1 else self.columns[0]
+        i = self.columns.index(column)
+        x = np.array(values, dtype=np.float64)
+        np.subtract(x, self.center_[i], out=x)
+        np.divide(x, self.spread_[i], out=x)
+        return x.astype(dtype, copy=False)
+
+    def inverse_transform(self, df, inplace=False):
+        """Undo transform() on the fitted columns."""
+        self._check_fitted()
+        out = df if inplace else df.copy(deep=False)
+        block = df[self.columns].to_numpy(dtype=np.float64, copy=True)
+        np.multiply(block, self.spread_, out=block)
+        np.add(block, self.center_, out=block)
+        for i, col in enumerate(self.columns):
+            out[col] = block[:, i]
+        return out
+
+    def fit_transform(self, df, inplace=False, suffix="", dtype=np.float64):
+        return self.fit(df).transform(df, inplace=inplace, suffix=suffix, dtype=dtype)
+
+    def _check_fitted(self):
+        if self.center_ is None:
+            raise ValueError("Scaler is not fitted yet; call fit() or partial_fit() first")
+
+    def save(self, path):
+        """Write the fitted parameters to a JSON file."""
+        self._check_fitted()
+        params = {"method": self.method, "columns": self.columns,
+                  "center": self.center_.tolist(), "spread": self.spread_.tolist()}
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(params, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        """
+        Read parameters written by save().
+
+        The loaded scaler can transform, but not continue fitting.
+        """
+        with open(path, encoding="utf-8") as f:
+            params = json.load(f)
+        scaler = cls(params["method"], params["columns"])
+        scaler.center_ = np.array(params["center"], dtype=np.float64)
+        scaler.spread_ = np.array(params["spread"], dtype=np.float64)
+        return scaler
+
+
+if __name__ == "__main__":
+    df = pd.read_csv("../grades.csv")
+
+    # Fit the term's scale once (streaming over chunks) and save it
+    scaler = Scaler("minmax", ["Grade"]).fit(pd.read_csv("../grades.csv", chunksize=4))
+    scaler.save("../grade_scale.json")
+
+    # Score a new batch against the saved scale: one multiply-add
+    today = Scaler.load("../grade_scale.json")
+    print(today.transform(df, suffix="_norm"))
+
+    for method in ("zscore", "robust"):
+        print(method, Scaler(method, ["Grade"]).fit(df).scale(df["Grade"]))
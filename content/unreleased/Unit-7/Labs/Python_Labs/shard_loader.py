@@ -0,0 +1,124 @@
+"""
+Module: shard_loader
+
+Load many CSV / JSON / Excel files (shards) of the same table in parallel.
+
+Each shard is parsed in a separate worker process with an explicit dtype
+schema, so Pandas does not have to guess column types and no `astype` /
+`to_datetime` clean-up is needed afterwards (see q11_type_conversion.py).
+"""
+
+import glob
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Schema of grades.csv: StudentID,Name,Subject,Grade,Date
+GRADES_SCHEMA = {"StudentID": "int32", "Subject": "category", "Grade": "float32"}
+GRADES_DATES = ("Date",)
+
+# Schema of students.json: id, name, marks
+STUDENTS_SCHEMA = {"id": "int32", "marks": "float32"}
+
+
+def read_shard(path, schema=GRADES_SCHEMA, dates=GRADES_DATES):
+    """
+    Read one file using a fixed schema.
+
+    Args:
+        path (str): A .csv, .json, .jsonl, .xls or .xlsx file.
+        schema (dict): Column name -> dtype.
+        dates (tuple of str): Columns holding ISO dates.
+            Schema entries and dates for columns the file does not have
+            are ignored, so other tables (e.g. students.json) can be read
+            with the defaults.
+
+    Returns:
+        pandas.DataFrame: The typed rows of the file.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".csv":
+        header = set(pd.read_csv(path, nrows=0).columns)
+        return pd.read_csv(path, dtype={k: v for k, v in schema.items() if k in header},
+                           parse_dates=[c for c in dates if c in header], date_format="ISO8601")
+    if ext in (".json", ".jsonl"):
+        # JSON has no dtype-per-column parser, so convert right after decoding.
+        df = pd.read_json(path, lines=ext == ".jsonl", dtype=False, convert_dates=False)
+    elif ext in (".xls", ".xlsx"):
+        header = set(pd.read_excel(path, nrows=0).columns)
+        df = pd.read_excel(path, dtype={k: v for k, v in schema.items() if k in header and v != "category"})
+    else:
+        raise ValueError(f"Unsupported file type: {path}")
+    df = df.astype({k: v for k, v in schema.items() if k in df.columns})
+    for col in dates:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format="ISO8601")
+    return df
+
+
+def _paths(pattern):
+    if isinstance(pattern, str):
+        paths = sorted(glob.glob(pattern))
+    else:
+        paths = list(pattern)
+    if not paths:
+        raise FileNotFoundError(f"No files match {pattern!r}")
+    return paths
+
+
+def iter_shards(pattern, schema=GRADES_SCHEMA, dates=GRADES_DATES, workers=None):
+    """
+    Parse every matching file in a process pool and yield them in path order.
+
+    Args:
+        pattern (str or list of str): A glob such as "sections/*.csv", or a
+            list of paths.
+        schema (dict): Column name -> dtype.
+        dates (tuple of str): Columns holding ISO dates.
+        workers (int, optional): Number of processes (default: CPU count).
+
+    Yields:
+        pandas.DataFrame: One typed frame per file.
+    """
+    paths = _paths(pattern)
+    reader = partial(read_shard, schema=schema, dates=dates)
+    if len(paths) == 1 or workers == 1:
+        yield from map(reader, paths)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(reader, paths)
+
+
+def load_shards(pattern, schema=GRADES_SCHEMA, dates=GRADES_DATES, workers=None):
+    """
+    Parse every matching file in parallel and concatenate them.
+
+    Category columns keep the category dtype: their categories are unioned
+    across files before concatenation.
+
+    Args:
+        pattern (str or list of str): A glob or a list of paths.
+        schema (dict): Column name -> dtype.
+        dates (tuple of str): Columns holding ISO dates.
+        workers (int, optional): Number of processes (default: CPU count).
+
+    Returns:
+        pandas.DataFrame: All rows, with the schema's dtypes.
+    """
+    frames = list(iter_shards(pattern, schema, dates, workers))
+    for col, dtype in schema.items():
+        if dtype == "category" and all(col in f.columns for f in frames):
+            categories = union_categoricals([f[col] for f in frames]).categories
+            for f in frames:
+                f[col] = f[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+if __name__ == "__main__":
+    df = load_shards("../grades*.csv")
+    print(df.dtypes)
+    students = load_shards("../students*.json", schema=STUDENTS_SCHEMA, dates=())
+    print(students.dtypes)
@@ -0,0 +1,119 @@
+"""
+Incremental Correlation and Covariance
+
+- CorrAccumulator keeps the row count, column means and the co-moment
+  matrix (sum of cross-products of deviations) of a set of columns
+- New rows are added in batches; accumulators from separate workers merge
+- cov() and corr() are computed from these statistics alone, in O(k^2),
+  without reading the data again
+"""
+
+import numpy as np
+import pandas as pd
+
+
+class CorrAccumulator:
+    """
+    Running covariance/correlation of a fixed set of columns.
+
+    Rows with a missing value in any of the columns are skipped (pandas
+    instead uses every pair of values that is present).
+
+    Args:
+        columns (list of str): The columns to track, in matrix order.
+
+    Examples:
+        >>> acc = CorrAccumulator(['x', 'y'])
+        >>> acc.update(pd.DataFrame({'x': [1, 2], 'y': [2, 4]}))
+        >>> acc.update(pd.DataFrame({'x': [3], 'y': [6]}))
+        >>> print(acc.n, round(acc.corr().loc['x', 'y'], 6))
+        3 1.0
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.n = 0
+        self.mean = np.zeros(k)
+        self.comoment = np.zeros((k, k))
+
+    def update(self, rows):
+        """
+        Add a batch of rows.
+
+        Args:
+            rows (pandas.DataFrame or numpy.ndarray): The new rows. A DataFrame
+                must contain the tracked columns; an array must have them in order.
+        """
+        if isinstance(rows, pd.DataFrame):
+            rows = rows[self.columns].to_numpy(dtype=float)
+        x = np.asarray(rows, dtype=float).reshape(-1, len(self.columns))
+        x = x[~np.isnan(x).any(axis=1)]
+        if len(x) == 0:
+            return
+        batch = CorrAccumulator(self.columns)
+        batch.n = len(x)
+        batch.mean = x.mean(axis=0)
+        d = x - batch.mean
+        batch.comoment = d.T @ d
+        self.merge(batch)
+
+    def merge(self, other):
+        """
+        Combine the statistics of another accumulator into this one.
+
+        Args:
+            other (CorrAccumulator): An accumulator over the same columns.
+
+        Returns:
+            CorrAccumulator: self, so calls can be chained.
+        """
+        if other.columns != self.columns:
+            raise ValueError("Accumulators must track the same columns to be merged")
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.comoment += other.comoment + np.outer(delta, delta) * self.n * other.n / n
+        self.mean += delta * other.n / n
+        self.n = n
+        return self
+
+    @property
+    def sums(self):
+        """Column sums."""
+        return self.mean * self.n
+
+    def cov(self, ddof=1):
+        """
+        Covariance matrix, like `df.cov()`.
+
+        Returns:
+            pandas.DataFrame: k x k covariance matrix.
+        """
+        denom = self.n - ddof
+        values = self.comoment / denom if denom > 0 else np.full_like(self.comoment, np.nan)
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
+
+    def corr(self):
+        """
+        Pearson correlation matrix, like `df.corr()`.
+
+        Returns:
+            pandas.DataFrame: k x k correlation matrix.
+        """
+        scale = np.sqrt(np.diag(self.comoment))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            values = self.comoment / np.outer(scale, scale)
+        np.clip(values, -1.0, 1.0, out=values)
+        return pd.DataFrame(values, index=self.columns, columns=self.columns)
+
+
+if __name__ == '__main__':
+    columns = ['marks', 'study_hours', 'attendance']
+    acc = CorrAccumulator(columns)
+    for chunk in pd.read_csv('students.csv', chunksize=1000):
+        acc.update(chunk)
+    print(acc.cov())
+    print(acc.corr())
+    print('Correlation (study_hours, marks):', acc.corr().loc['study_hours', 'marks'])
@@ -0,0 +1,246 @@
+"""
+Fast Plots for Large Datasets
+
+- hist() bins the data with np.histogram and draws only the bins
+- scatter() switches to a hexbin density plot (or a sample, when colouring
+  by a group) once there are more than `max_points` points
+- pairplot() aggregates every panel the same way instead of drawing every row
+- plotly_scatter() does the same for interactive Plotly charts
+- render_many() draws many figures headless (Agg backend) in worker
+  processes and saves them as image files
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 10_000
+
+
+def use_headless():
+    """Switch Matplotlib to the non-interactive Agg backend (no windows)."""
+    matplotlib.use("Agg")
+
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def hist(values, bins=10, range=None, ax=None, **kwargs):
+    """
+    Draw a histogram from pre-computed bin counts.
+
+    Args:
+        values (array-like): The data (NaN values are ignored).
+        bins (int or sequence): Number of bins or bin edges.
+        range (tuple, optional): (low, high) of the bins.
+        ax (matplotlib.axes.Axes, optional): Where to draw.
+        **kwargs: Passed to ax.stairs (e.g. color, label).
+
+    Returns:
+        tuple: (counts, edges) as from np.histogram.
+    """
+    ax = ax or _pyplot().gca()
+    x = np.asarray(values, dtype=float)
+    counts, edges = np.histogram(x[~np.isnan(x)], bins=bins, range=range)
+    ax.stairs(counts, edges, fill=True, **kwargs)
+    return counts, edges
+
+
+def _sample(n, max_points, groups=None, seed=0):
+    """Row positions of a random sample, stratified by group if given."""
+    rng = np.random.default_rng(seed)
+    if groups is None:
+        return np.sort(rng.choice(n, max_points, replace=False))
+    codes, _ = pd.factorize(groups)
+    keep = []
+    for code in np.unique(codes):
+        rows = np.flatnonzero(codes == code)
+        k = max(1, int(round(max_points * len(rows) / n)))
+        keep.append(rng.choice(rows, min(k, len(rows)), replace=False))
+    return np.sort(np.concatenate(keep))
+
+
+def scatter(x, y, hue=None, ax=None, max_points=MAX_POINTS, gridsize=60, hexbin_kw=None, **kwargs):
+    """
+    Scatter plot that stays fast for millions of points.
+
+    Up to `max_points` points are drawn directly. Above that, a hexbin
+    density plot is drawn, or, when `hue` is given, a stratified random
+    sample of `max_points` points (rasterized, so saved files stay small).
+
+    Args:
+        x, y (array-like): Coordinates.
+        hue (array-like, optional): Group of each point, used for colour.
+        ax (matplotlib.axes.Axes, optional): Where to draw.
+        max_points (int): Largest number of points drawn one by one.
+        gridsize (int): Hexagons across the x axis for the density plot.
+        hexbin_kw (dict, optional): Passed to ax.hexbin when the density
+            plot is drawn (e.g. cmap).
+        **kwargs: Passed to ax.scatter when points are drawn (e.g. s,
+            marker, alpha). They are not used for the density plot, so
+            marker options are safe at any size.
+
+    Returns:
+        The Matplotlib artist(s) created.
+
+    Examples:
+        >>> use_headless()
+        >>> fig, ax = _pyplot().subplots()
+        >>> n = MAX_POINTS + 1
+        >>> type(scatter(np.arange(n), np.arange(n), ax=ax, s=10)).__name__
+        'PolyCollection'
+        >>> _pyplot().close(fig)
+    """
+    ax = ax or _pyplot().gca()
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n > max_points and hue is None:
+        art = ax.hexbin(x, y, gridsize=gridsize, mincnt=1, bins="log", **(hexbin_kw or {}))
+        ax.figure.colorbar(art, ax=ax, label="count")
+        return art
+    rows = _sample(n, max_points, hue) if n > max_points else np.arange(n)
+    rasterized = n > max_points
+    if hue is None:
+        return ax.scatter(x[rows], y[rows], rasterized=rasterized, **kwargs)
+    hue = np.asarray(hue)[rows]
+    artists = []
+    for group in pd.unique(hue):
+        sel = rows[hue == group]
+        artists.append(ax.scatter(x[sel], y[sel], label=str(group), rasterized=rasterized, **kwargs))
+    ax.legend(title="sampled" if rasterized else None)
+    return artists
+
+
+def pairplot(df, hue=None, columns=None, bins=20, max_points=2_000, gridsize=30):
+    """
+    Pair plot where every panel is aggregated.
+
+    Diagonal panels are histograms of all the data (one per hue group).
+    Off-diagonal panels use scatter() rules: all points when small, hexbin
+    or a stratified sample when large.
+
+    Args:
+        df (pandas.DataFrame): The data.
+        hue (str, optional): Column used for colour.
+        columns (list of str, optional): Numeric columns (default: all numeric).
+        bins (int): Histogram bins on the diagonal.
+        max_points (int): Largest number of points drawn per panel.
+        gridsize (int): Hexagons across each density panel.
+
+    Returns:
+        matplotlib.figure.Figure: The figure.
+    """
+    plt = _pyplot()
+    columns = columns or df.select_dtypes(include="number").columns.tolist()
+    k = len(columns)
+    fig, axes = plt.subplots(k, k, figsize=(2.5 * k, 2.5 * k), squeeze=False)
+    groups = df[hue] if hue else None
+    for i, row in enumerate(columns):
+        for j, col in enumerate(columns):
+            ax = axes[i, j]
+            if i == j:
+                rng = (df[col].min(), df[col].max())
+                if hue:
+                    for group in pd.unique(groups):
+                        hist(df.loc[groups == group, col], bins=bins, range=rng, ax=ax, alpha=0.5)
+                else:
+                    hist(df[col], bins=bins, range=rng, ax=ax)
+            elif len(df) > max_points and hue is None:
+                ax.hexbin(df[col], df[row], gridsize=gridsize, mincnt=1, bins="log")
+            else:
+                rows = _sample(len(df), max_points, groups) if len(df) > max_points else np.arange(len(df))
+                sub = df.iloc[rows]
+                codes = pd.factorize(sub[hue])[0] if hue else None
+                ax.scatter(sub[col], sub[row], c=codes, s=5, cmap="tab10" if hue else None,
+                           rasterized=len(df) > max_points)
+            if i == k - 1:
+                ax.set_xlabel(col)
+            if j == 0:
+                ax.set_ylabel(row)
+    fig.tight_layout()
+    return fig
+
+
+def plotly_scatter(df, x, y, color=None, max_points=MAX_POINTS, nbins=100, **kwargs):
+    """
+    Plotly scatter that switches to a density heatmap for large data.
+
+    Args:
+        df (pandas.DataFrame): The data.
+        x, y (str): Columns on the axes.
+        color (str, optional): Column used for colour (ignored for the heatmap).
+        max_points (int): Largest number of points sent to the browser.
+        nbins (int): Heatmap bins per axis.
+
+    Returns:
+        plotly.graph_objects.Figure: The figure.
+    """
+    import plotly.express as px
+
+    if len(df) <= max_points:
+        return px.scatter(df, x=x, y=y, color=color, **kwargs)
+    return px.density_heatmap(df, x=x, y=y, nbinsx=nbins, nbinsy=nbins, **kwargs)
+
+
+def _render(task):
+    path, draw, kwargs = task
+    use_headless()
+    plt = _pyplot()
+    fig = plt.figure()
+    drawn = draw(**kwargs)
+    if drawn is not None and drawn is not fig:
+        plt.close(fig)
+        fig = drawn
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def render_many(tasks, workers=None):
+    """
+    Draw and save many figures in parallel, without opening any windows.
+
+    Args:
+        tasks (list of tuple): (output path, draw function, keyword arguments).
+            The draw function is called with the keyword arguments and
+            should draw on the new current figure or return its own Figure. It must be
+            defined at module level so worker processes can import it.
+        workers (int, optional): Worker processes (default: CPU count).
+
+    Returns:
+        list of str: The saved file paths.
+    """
+    for path, _, _ in tasks:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if workers == 1 or len(tasks) <= 1:
+        return [_render(task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render, tasks))
+
+
+def _marks_histogram(marks, title):
+    plt = _pyplot()
+    hist(marks, bins=5)
+    plt.xlabel('Marks')
+    plt.ylabel('Count')
+    plt.title(title)
+
+
+if __name__ == '__main__':
+    use_headless()
+    df = pd.read_csv('students.csv')
+    render_many([('charts/marks_histogram.png', _marks_histogram,
+                  {'marks': df['marks'], 'title': 'Distribution of Marks'})])
+    plt = _pyplot()
+    plt.figure()
+    scatter(df['study_hours'], df['marks'])
+    plt.xlabel('Study Hours')
+    plt.ylabel('Marks')
+    plt.savefig('charts/study_hours_vs_marks.png')
+    print('Charts saved to charts/')
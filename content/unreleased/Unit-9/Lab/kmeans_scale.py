@@ -0,0 +1,161 @@
+# KMeans for large student datasets
+#
+# - fit_stream(): mini-batch KMeans trained with partial_fit, one chunk at a
+#   time, so millions of (study_hours, marks) rows never sit in memory at once.
+# - fit_parallel(): runs several KMeans initializations in a process pool and
+#   keeps the one with the lowest inertia. The data is copied once into
+#   shared memory, and each worker's BLAS/OpenMP threads are limited so the
+#   workers together use each core once.
+# - Data is stored as float32, which halves memory compared to float64.
+# - Both accept `init` centroids (e.g. last term's, see save_centroids /
+#   load_centroids) to warm start and cut the number of iterations.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+from sklearn.cluster import KMeans, MiniBatchKMeans
+from threadpoolctl import threadpool_limits
+
+
+def _as_float32(X):
+    if hasattr(X, "to_numpy"):
+        X = X.to_numpy()
+    return np.ascontiguousarray(X, dtype=np.float32)
+
+
+def fit_stream(chunks, n_clusters, init=None, batch_size=4096, random_state=0):
+    """
+    Train mini-batch KMeans over an iterator of chunks.
+
+    Args:
+        chunks: Iterator of 2-D arrays or DataFrames (same columns each time).
+        n_clusters (int): Number of clusters.
+        init (array-like, optional): Starting centroids, shape (n_clusters, n_features).
+        batch_size (int): Rows per mini-batch update inside each chunk.
+        random_state (int): Seed for k-means++ when no `init` is given.
+
+    Returns:
+        MiniBatchKMeans: The fitted model.
+
+    Raises:
+        ValueError: If all chunks together have fewer than n_clusters rows.
+    """
+    model = MiniBatchKMeans(
+        n_clusters=n_clusters,
+        init="k-means++" if init is None else _as_float32(init),
+        n_init=1,
+        batch_size=batch_size,
+        random_state=random_state,
+    )
+    # The first update needs at least n_clusters rows, so small leading
+    # chunks are held back and joined until there are enough.
+    pending = []
+    for chunk in chunks:
+        X = _as_float32(chunk)
+        if pending is not None:
+            pending.append(X)
+            if sum(len(p) for p in pending) < n_clusters:
+                continue
+            X, pending = np.concatenate(pending), None
+            first = max(batch_size, n_clusters)
+            model.partial_fit(X[:first])
+            X = X[first:]
+        for start in range(0, len(X), batch_size):
+            model.partial_fit(X[start:start + batch_size])
+    if pending is not None:
+        raise ValueError(f"fit_stream needs at least n_clusters={n_clusters} rows")
+    return model
+
+
+def predict_stream(model, chunks):
+    """Yield the cluster labels of each chunk."""
+    for chunk in chunks:
+        yield model.predict(_as_float32(chunk))
+
+
+def _fit_one(X, n_clusters, init, seed):
+    model = KMeans(n_clusters=n_clusters, init=init, n_init=1, random_state=seed)
+    return model.fit(X)
+
+
+# Set in each worker process by _attach.
+_shared = {}
+
+
+def _attach(name, shape, threads):
+    shm = shared_memory.SharedMemory(name=name)
+    _shared["shm"] = shm
+    _shared["X"] = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+    _shared["limits"] = threadpool_limits(threads)
+
+
+def _fit_shared(n_clusters, seed):
+    model = _fit_one(_shared["X"], n_clusters, "k-means++", seed)
+    # Only the centroids travel back; labels are recomputed for the winner.
+    del model.labels_
+    return model
+
+
+def fit_parallel(X, n_clusters, n_init=8, workers=None, init=None, random_state=0):
+    """
+    Run `n_init` KMeans initializations in parallel and keep the best.
+
+    Args:
+        X (array-like): The data, shape (n_samples, n_features).
+        n_clusters (int): Number of clusters.
+        n_init (int): Number of random initializations (ignored with `init`).
+        workers (int, optional): Worker processes (default: CPU count,
+            at most n_init).
+        init (array-like, optional): Starting centroids; one run is done from them.
+        random_state (int): Base seed; run i uses random_state + i.
+
+    Returns:
+        KMeans: The fitted model with the lowest inertia.
+    """
+    X = _as_float32(X)
+    if init is not None:
+        return _fit_one(X, n_clusters, _as_float32(init), random_state)
+    seeds = [random_state + i for i in range(n_init)]
+    if n_init == 1 or workers == 1:
+        models = [_fit_one(X, n_clusters, "k-means++", s) for s in seeds]
+    else:
+        cpus = os.cpu_count() or 1
+        workers = min(workers or cpus, n_init)
+        shm = shared_memory.SharedMemory(create=True, size=max(X.nbytes, 1))
+        try:
+            np.ndarray(X.shape, dtype=np.float32, buffer=shm.buf)[:] = X
+            with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                     initargs=(shm.name, X.shape, max(1, cpus // workers))) as pool:
+                models = list(pool.map(_fit_shared, [n_clusters] * n_init, seeds))
+        finally:
+            shm.close()
+            shm.unlink()
+        best = min(models, key=lambda m: m.inertia_)
+        best.labels_ = best.predict(X)
+        return best
+    return min(models, key=lambda m: m.inertia_)
+
+
+def save_centroids(model, path):
+    """Save fitted centroids (.npy) for warm starting next time."""
+    np.save(path, model.cluster_centers_.astype(np.float32))
+
+
+def load_centroids(path):
+    """Load centroids saved with save_centroids."""
+    return np.load(path)
+
+
+if __name__ == "__main__":
+    # Same (study_hours, marks) data as lab3_clustering.py
+    X = np.array([[2, 60], [3, 65], [4, 70], [5, 75], [6, 80], [7, 85]])
+
+    kmeans = fit_parallel(X, n_clusters=2, n_init=4)
+    print(f"Cluster labels (parallel): {kmeans.labels_}")
+
+    stream = fit_stream((X[i:i + 3] for i in range(0, len(X), 3)), n_clusters=2,
+                        init=kmeans.cluster_centers_)
+    labels = np.concatenate(list(predict_stream(stream, [X])))
+    print(f"Cluster labels (mini-batch, warm start): {labels}")
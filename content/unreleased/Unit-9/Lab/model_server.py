@@ -0,0 +1,267 @@
+# Serving Unit-9 models to many users
+#
+# - save_model / load_model: persist a fitted model with joblib; arrays are
+#   memory-mapped on load, so restarting the server is fast.
+# - BatchPredictor: individual predict requests are queued and answered
+#   together with one vectorized model.predict call per micro-batch. Repeated
+#   inputs are served from an LRU cache (or share the pending prediction if
+#   one is already queued), and request latency is recorded.
+# - serve(): a small asyncio HTTP front end, e.g.
+#       GET /predict?marks=68   -> {"prediction": 1}
+#       GET /stats              -> latency percentiles and cache hits
+
+import asyncio
+import json
+import time
+from collections import OrderedDict, deque
+from urllib.parse import parse_qs, urlsplit
+
+import joblib
+import numpy as np
+import pandas as pd
+
+
+def save_model(model, path):
+    """Save a fitted model (uncompressed, so it can be memory-mapped)."""
+    joblib.dump(model, path, compress=0)
+
+
+def load_model(path):
+    """Load a model saved with save_model, memory-mapping its arrays."""
+    return joblib.load(path, mmap_mode="r")
+
+
+class LRUCache:
+    """Least-recently-used cache of a fixed size."""
+
+    def __init__(self, maxsize=10_000):
+        self.maxsize = maxsize
+        self.data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        if key in self.data:
+            self.data.move_to_end(key)
+            self.hits += 1
+            return self.data[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value):
+        self.data[key] = value
+        self.data.move_to_end(key)
+        if len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+
+class BatchPredictor:
+    """
+    Collect single predictions into micro-batches.
+
+    Args:
+        model: A fitted scikit-learn style model with predict().
+        max_batch (int): Largest number of requests answered together.
+        max_wait (float): Seconds to wait for more requests before running
+            a partial batch.
+        cache_size (int): Entries in the LRU cache of recent inputs (0 = off).
+        history (int): Number of recent latencies kept for percentiles.
+    """
+
+    def __init__(self, model, max_batch=512, max_wait=0.002, cache_size=10_000, history=10_000):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = LRUCache(cache_size) if cache_size else None
+        self.latencies = deque(maxlen=history)
+        self.batches = 0
+        self._columns = getattr(model, "feature_names_in_", None)
+        self._width = getattr(model, "n_features_in_", None)
+        self._pending = {}
+        self._queue = None
+        self._worker = None
+
+    async def predict(self, features):
+        """
+        Predict for one input.
+
+        Args:
+            features (sequence of float): One row of feature values.
+
+        Returns:
+            The model's prediction for that row.
+
+        Raises:
+            ValueError: If the row has the wrong number of features (checked
+                here, so one bad request cannot fail a whole batch).
+        """
+        start = time.perf_counter()
+        key = tuple(float(v) for v in features)
+        if self._width is None:
+            self._width = len(key)
+        elif len(key) != self._width:
+            raise ValueError(f"expected {self._width} feature(s), got {len(key)}")
+        result = self.cache.get(key) if self.cache is not None else None
+        if result is None:
+            future = self._pending.get(key)
+            if future is None:
+                if self._worker is None or self._worker.done():
+                    self._queue = asyncio.Queue()
+                    self._worker = asyncio.create_task(self._run())
+                future = asyncio.get_running_loop().create_future()
+                self._pending[key] = future
+                self._queue.put_nowait((key, future))
+            result = await asyncio.shield(future)
+        self.latencies.append(time.perf_counter() - start)
+        return result
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(batch) < self.max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - time.perf_counter()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                self._predict_batch(batch)
+            except Exception as exc:
+                # Keep serving: fail this batch's requests, not the worker.
+                for key, future in batch:
+                    self._pending.pop(key, None)
+                    if not future.done():
+                        future.set_exception(exc)
+
+    def _predict_batch(self, batch):
+        for key, _ in batch:
+            self._pending.pop(key, None)
+        try:
+            X = np.array([key for key, _ in batch], dtype=float)
+            if self._columns is not None:
+                X = pd.DataFrame(X, columns=self._columns)
+            predictions = self.model.predict(X)
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        self.batches += 1
+        for (key, future), value in zip(batch, predictions.tolist()):
+            if self.cache is not None:
+                self.cache.put(key, value)
+            if not future.done():
+                future.set_result(value)
+
+    def stats(self):
+        """Latency percentiles (milliseconds) and cache/batch counters."""
+        lat = np.array(self.latencies) * 1000
+        stats = {"requests": len(lat), "batches": self.batches}
+        if len(lat):
+            for p in (50, 90, 99):
+                stats[f"p{p}_ms"] = float(np.percentile(lat, p))
+        if self.cache is not None:
+            stats["cache_hits"] = self.cache.hits
+            stats["cache_misses"] = self.cache.misses
+        return stats
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        # Requests still queued will never be answered; fail them rather than
+        # letting a later request for the same input wait on them forever.
+        for future in self._pending.values():
+            if not future.done():
+                future.cancel()
+        self._pending.clear()
+
+
+def _response(writer, status, body):
+    payload = json.dumps(body).encode()
+    writer.write(f"HTTP/1.1 {status}\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(payload)}\r\nConnection: close\r\n\r\n".encode() + payload)
+
+
+async def serve(predictor, features, host="127.0.0.1", port=8000):
+    """
+    Run an HTTP front end for a BatchPredictor.
+
+    Args:
+        predictor (BatchPredictor): The predictor to use.
+        features (list of str): Query parameter names, in the model's column order.
+        host (str): Interface to listen on.
+        port (int): Port to listen on.
+
+    Returns:
+        asyncio.Server: The running server (use `async with` or close()).
+    """
+
+    async def handle(reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+            method, target = request.decode("latin-1").split(" ", 2)[:2]
+            url = urlsplit(target)
+            if method != "GET":
+                _response(writer, "405 Method Not Allowed", {"error": "use GET"})
+            elif url.path == "/stats":
+                _response(writer, "200 OK", predictor.stats())
+            elif url.path == "/predict":
+                query = parse_qs(url.query)
+                try:
+                    row = [float(query[name][0]) for name in features]
+                except (KeyError, ValueError):
+                    _response(writer, "400 Bad Request", {"error": f"expected numeric {features}"})
+                else:
+                    try:
+                        prediction = await predictor.predict(row)
+                    except Exception as exc:
+                        _response(writer, "500 Internal Server Error", {"error": f"{type(exc).__name__}: {exc}"})
+                    else:
+                        _response(writer, "200 OK", {"prediction": prediction})
+            else:
+                _response(writer, "404 Not Found", {"error": "unknown path"})
+            await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+if __name__ == "__main__":
+    import sys
+
+    from sklearn.tree import DecisionTreeClassifier
+
+    # Same model as lab2_classification.py
+    df = pd.DataFrame({'marks': [60, 65, 70, 75, 80], 'pass_fail': [0, 0, 1, 1, 1]})
+    model = DecisionTreeClassifier().fit(df[['marks']], df['pass_fail'])
+    save_model(model, "pass_fail_model.joblib")
+    predictor = BatchPredictor(load_model("pass_fail_model.joblib"))
+
+    async def main():
+        if "--serve" in sys.argv:
+            server = await serve(predictor, ["marks"])
+            print("Serving on http://127.0.0.1:8000/predict?marks=68")
+            async with server:
+                await server.serve_forever()
+        # 5000 concurrent "predicted pass/fail" queries
+        marks = np.random.default_rng(0).integers(30, 100, 5000)
+        results = await asyncio.gather(*(predictor.predict([m]) for m in marks))
+        print(f"Predicted pass/fail for 68 marks: {'Pass' if await predictor.predict([68]) else 'Fail'}")
+        print(f"Answered {len(results)} queries:", predictor.stats())
+        await predictor.close()
+
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+# Linear regression trained chunk by chunk
+#
+# - StreamingLinearRegression accumulates the statistics of the normal
+#   equations (X^T X and X^T y, kept centred for accuracy) over streamed
+#   chunks, then solves them when coefficients are needed.
+# - Memory is O(features^2), not O(rows).
+# - New data can be added at any time without refitting, and models trained
+#   on separate chunks/workers can be merged.
+
+import numpy as np
+import pandas as pd
+
+
+class StreamingLinearRegression:
+    """
+    Ordinary least squares (optionally ridge) fitted from streamed chunks.
+
+    Args:
+        alpha (float): Ridge penalty added to the diagonal (0 = plain OLS).
+
+    Examples:
+        >>> model = StreamingLinearRegression()
+        >>> _ = model.partial_fit([[2], [3]], [60, 65])
+        >>> _ = model.partial_fit([[4], [5], [6]], [70, 75, 80])
+        >>> print(round(float(model.predict([[7]])[0]), 2))
+        85.0
+    """
+
+    def __init__(self, alpha=0.0):
+        self.alpha = alpha
+        self.n = 0
+        self.feature_names_in_ = None
+        self._mean_x = None
+        self._mean_y = 0.0
+        self._sxx = None  # sum of outer products of centred x
+        self._sxy = None  # sum of centred x times centred y
+        self._syy = 0.0
+        self._solved = None
+
+    def _prepare(self, X, y):
+        if isinstance(X, pd.DataFrame):
+            if self.feature_names_in_ is None:
+                self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+            X = X[self.feature_names_in_].to_numpy(dtype=float)
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+        y = np.asarray(y, dtype=float).ravel()
+        if len(X) != len(y):
+            raise ValueError(f"X has {len(X)} rows but y has {len(y)}")
+        # One NaN would spoil the running sums for good, so refuse it up
+        # front like scikit-learn does (drop or impute those rows first).
+        for name, values in (("X", X), ("y", y)):
+            if not np.isfinite(values).all():
+                raise ValueError(f"Input {name} contains NaN or infinity")
+        return X, y
+
+    def partial_fit(self, X, y):
+        """
+        Add a chunk of training data.
+
+        Args:
+            X (array-like or DataFrame): Features, shape (n_rows, n_features).
+            y (array-like): Targets, shape (n_rows,).
+
+        Returns:
+            StreamingLinearRegression: self, so calls can be chained.
+
+        Raises:
+            ValueError: If X or y contains NaN or infinity; the model is
+                left unchanged.
+        """
+        X, y = self._prepare(X, y)
+        if len(y) == 0:
+            return self
+        chunk = StreamingLinearRegression(self.alpha)
+        chunk.n = len(y)
+        chunk._mean_x = X.mean(axis=0)
+        chunk._mean_y = y.mean()
+        dx = X - chunk._mean_x
+        dy = y - chunk._mean_y
+        chunk._sxx = dx.T @ dx
+        chunk._sxy = dx.T @ dy
+        chunk._syy = dy @ dy
+        return self.merge(chunk)
+
+    def fit(self, X, y):
+        """Reset the statistics and fit on one dataset (like scikit-learn)."""
+        self.__init__(self.alpha)
+        return self.partial_fit(X, y)
+
+    def merge(self, other):
+        """
+        Combine the statistics of a model trained on other data.
+
+        Args:
+            other (StreamingLinearRegression): Trained on the same features.
+
+        Returns:
+            StreamingLinearRegression: self, so calls can be chained.
+        """
+        if other.n == 0:
+            return self
+        if self.feature_names_in_ is None:
+            self.feature_names_in_ = other.feature_names_in_
+        if self.n == 0:
+            self.n = other.n
+            self._mean_x = other._mean_x.copy()
+            self._mean_y = other._mean_y
+            self._sxx = other._sxx.copy()
+            self._sxy = other._sxy.copy()
+            self._syy = other._syy
+        else:
+            if other._mean_x.shape != self._mean_x.shape:
+                raise ValueError("Models must use the same number of features to be merged")
+            n = self.n + other.n
+            w = self.n * other.n / n
+            dx = other._mean_x - self._mean_x
+            dy = other._mean_y - self._mean_y
+            self._sxx += other._sxx + np.outer(dx, dx) * w
+            self._sxy += other._sxy + dx * dy * w
+            self._syy += other._syy + dy * dy * w
+            self._mean_x += dx * other.n / n
+            self._mean_y += dy * other.n / n
+            self.n = n
+        self._solved = None
+        return self
+
+    def _solve(self):
+        if self.n == 0:
+            raise ValueError("Model has not seen any data yet; call partial_fit first")
+        if self._solved is None:
+            a = self._sxx + self.alpha * np.eye(len(self._sxy))
+            coef = np.linalg.lstsq(a, self._sxy, rcond=None)[0]
+            self._solved = (coef, self._mean_y - self._mean_x @ coef)
+        return self._solved
+
+    @property
+    def coef_(self):
+        return self._solve()[0]
+
+    @property
+    def intercept_(self):
+        return self._solve()[1]
+
+    def predict(self, X):
+        """Predict targets for X."""
+        if isinstance(X, pd.DataFrame) and self.feature_names_in_ is not None:
+            X = X[self.feature_names_in_]
+        X = np.asarray(X, dtype=float)
+        if X.ndim == 1:
+            X = X.reshape(-1, 1)
+        coef, intercept = self._solve()
+        return X @ coef + intercept
+
+    def training_r2(self):
+        """R^2 on all the data seen so far (no second pass needed)."""
+        coef, _ = self._solve()
+        sse = self._syy - 2 * coef @ self._sxy + coef @ self._sxx @ coef
+        return 1 - sse / self._syy if self._syy else np.nan
+
+
+if __name__ == "__main__":
+    # Same data as lab1_regression.py, fed in two chunks
+    df = pd.DataFrame({'study_hours': [2, 3, 4, 5, 6], 'marks': [60, 65, 70, 75, 80]})
+    model = StreamingLinearRegression()
+    for chunk in (df.iloc[:2], df.iloc[2:]):
+        model.partial_fit(chunk[['study_hours']], chunk['marks'])
+    predicted = model.predict(pd.DataFrame({'study_hours': [7]}))
+    print(f"Predicted marks for 7 study hours: {predicted[0]:.2f}")
+
+    # lab_fix.py data, then more data arrives later without refitting
+    price = StreamingLinearRegression()
+    price.partial_fit(pd.DataFrame({'area': [1000, 1500, 2000]}), [200, 300, 400])
+    price.partial_fit(pd.DataFrame({'area': [2500]}), [500])
+    print(price.predict(pd.DataFrame({'area': [1200]})))